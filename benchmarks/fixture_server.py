@@ -0,0 +1,224 @@
+# benchmarks/fixture_server.py
+"""
+Local stand-in for the Glassdoor job search UI, for offline benchmarks.
+
+Serves a results page built with the selectors GlassdoorPage relies on (.jobCard with
+jobTitle / EmployerProfile / JobCard_location / trackingLink parts, data-test="load-more",
+data-test="show-more-cta", a jobDescription pane and the modal container), fed by
+GraphQL-shaped JSON from /graph so JobResponseCapture sees the same payload structure.
+
+    /jobs?cards=300&page=30&modal=10&latency=50   results page
+    /graph?op=list&offset=0&limit=30&cards=300    job list payload
+    /graph?op=detail&id=1000001                   job detail payload
+    /job-listing/<slug>?jl=<id>                   standalone job page (DescriptionPool path)
+
+latency (ms) is applied to every /graph and /job-listing response; modal=N injects the
+modal after every N-th load-more or card click (0 disables).
+
+Run standalone: python -m benchmarks.fixture_server --port 8765
+"""
+
+import argparse
+import html
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+FIRST_ID = 1_000_000
+MODAL_CLASS = "modal_ModalContainer__GGVJc"
+KEYWORD_WORDS = ("clearance", "sponsorship", "relocation")
+FILLER = ("python", "data", "team", "deliver", "platform", "customers", "build", "scalable", "services",
+          "experience", "cloud", "collaborate", "product", "engineering", "ownership", "quality", "testing",
+          "design", "automation", "support", "growth", "remote", "hybrid", "office", "benefits", "pension")
+
+def fake_job(job_id: int) -> dict:
+    rng = random.Random(job_id)
+    words = [rng.choice(FILLER) for _ in range(rng.randint(250, 450))]
+    if rng.random() < 0.15:
+        words.insert(rng.randrange(len(words)), rng.choice(KEYWORD_WORDS))
+    paragraphs = [" ".join(words[i:i + 60]).capitalize() + "." for i in range(0, len(words), 60)]
+    return {
+        "id": job_id,
+        "title": f"{rng.choice(('Senior', 'Junior', 'Lead', 'Staff'))} {rng.choice(('Python', 'Data', 'Backend', 'QA'))} Engineer {job_id}",
+        "company": f"Company {rng.randint(1, 200)}",
+        "location": rng.choice(("London", "Manchester", "Leeds", "Remote")),
+        "paragraphs": paragraphs,
+    }
+
+def job_link(job: dict) -> str:
+    return f"/job-listing/engineer-{job['id']}?jl={job['id']}"
+
+def jobview(job: dict, detail: bool = False) -> dict:
+    body = {"listingId": job["id"], "descriptionFragmentsText": [job["paragraphs"][0][:120]]}
+    if detail:
+        body["description"] = "".join(f"<p>{html.escape(p)}</p>" for p in job["paragraphs"])
+    return {"jobview": {
+        "header": {"jobTitleText": job["title"], "employerNameFromSearch": job["company"],
+                   "locationName": job["location"], "jobLink": job_link(job)},
+        "job": body,
+    }}
+
+PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Glassdoor fixture</title>
+<style>
+  body { font-family: sans-serif; display: flex; gap: 16px; }
+  #list { width: 40%; list-style: none; padding: 0; }
+  .jobCard { border: 1px solid #ccc; margin: 4px; padding: 6px; }
+  #detail { width: 55%; position: sticky; top: 0; }
+  .__MODAL__ { position: fixed; inset: 0; background: rgba(0,0,0,.5); display: flex; align-items: center; justify-content: center; }
+</style></head>
+<body>
+<div><ul id="list"></ul><button data-test="load-more" id="load-more">Show more jobs</button></div>
+<div id="detail"><h1 id="detail-title"></h1><div class="JobDetails_jobDescription__x1" id="desc"></div></div>
+<script>
+const CFG = __CFG__;
+let offset = 0, interactions = 0;
+const sleep = (ms) => new Promise((r) => setTimeout(r, ms));
+const esc = (s) => s.replace(/[&<>"]/g, (c) => ({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"}[c]));
+async function graph(params) {
+  const r = await fetch("/graph?" + new URLSearchParams({...params, latency: CFG.latency, cards: CFG.cards}));
+  return r.json();
+}
+function maybeModal() {
+  interactions++;
+  if (!CFG.modal || interactions % CFG.modal !== 0) return;
+  const m = document.createElement("div");
+  m.className = "__MODAL__";
+  m.innerHTML = "<div><p>Sign up for alerts</p><button>Close</button></div>";
+  m.querySelector("button").onclick = () => m.remove();
+  document.body.appendChild(m);
+}
+function renderCard(v) {
+  const h = v.jobview.header, id = v.jobview.job.listingId;
+  const li = document.createElement("li");
+  li.setAttribute("data-jobid", id);
+  li.innerHTML = `<div class="JobCard_jobCardContainer__x1 jobCard">
+      <a class="JobCard_trackingLink__x1" href="${h.jobLink}"><span class="JobCard_jobTitle__x1">${esc(h.jobTitleText)}</span></a>
+      <div class="EmployerProfile_compactEmployerName__x1">${esc(h.employerNameFromSearch)}</div>
+      <div class="JobCard_location__x1">${esc(h.locationName)}</div></div>`;
+  li.querySelector("a").addEventListener("click", (e) => { e.preventDefault(); openJob(id); });
+  return li;
+}
+async function loadPage() {
+  const data = await graph({op: "list", offset, limit: CFG.page});
+  const items = data.data.jobListings.jobListings;
+  const list = document.getElementById("list");
+  for (const v of items) list.appendChild(renderCard(v));
+  offset += items.length;
+  if (offset >= CFG.cards) document.getElementById("load-more").remove();
+}
+async function openJob(id) {
+  maybeModal();
+  const data = await graph({op: "detail", id});
+  const job = data.data.jobview;
+  document.getElementById("detail-title").textContent = job.header.jobTitleText;
+  const desc = document.getElementById("desc");
+  const full = job.job.description;
+  desc.innerHTML = full.slice(0, 300) + '<button data-test="show-more-cta">Show more</button>';
+  desc.querySelector("button").onclick = async () => { await sleep(CFG.latency / 4); desc.innerHTML = full; };
+}
+document.getElementById("load-more").onclick = async () => { maybeModal(); await loadPage(); };
+loadPage();
+</script></body></html>
+"""
+
+JOB_PAGE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>__TITLE__</title></head>
+<body><h1>__TITLE__</h1><div class="JobDetails_jobDescription__x1" id="desc">__SHORT__<button data-test="show-more-cta">Show more</button></div>
+<script>
+const full = __FULL__;
+document.querySelector('[data-test="show-more-cta"]').onclick = () => { document.getElementById("desc").innerHTML = full; };
+</script></body></html>
+"""
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    server_version = "GlassdoorFixture/1.0"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, content_type):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        latency = float(query.get("latency", self.server.default_latency)) / 1000
+        if url.path == "/jobs":
+            cfg = {"cards": int(query.get("cards", 300)), "page": int(query.get("page", 30)),
+                   "modal": int(query.get("modal", 0)), "latency": latency * 1000}
+            body = PAGE.replace("__CFG__", json.dumps(cfg)).replace("__MODAL__", MODAL_CLASS)
+            self._send(200, body, "text/html; charset=utf-8")
+        elif url.path == "/graph":
+            time.sleep(latency)
+            if query.get("op") == "detail":
+                payload = {"data": jobview(fake_job(int(query["id"])), detail=True)}
+            else:
+                offset, limit = int(query.get("offset", 0)), int(query.get("limit", 30))
+                total = int(query.get("cards", 300))
+                ids = range(FIRST_ID + offset, FIRST_ID + min(offset + limit, total))
+                payload = {"data": {"jobListings": {"jobListings": [jobview(fake_job(i)) for i in ids]}}}
+            self._send(200, json.dumps(payload), "application/json")
+        elif url.path.startswith("/job-listing/"):
+            time.sleep(latency)
+            job = fake_job(int(query.get("jl", FIRST_ID)))
+            full = "".join(f"<p>{html.escape(p)}</p>" for p in job["paragraphs"])
+            body = (JOB_PAGE.replace("__TITLE__", html.escape(job["title"]))
+                    .replace("__SHORT__", full[:300]).replace("__FULL__", json.dumps(full)))
+            self._send(200, body, "text/html; charset=utf-8")
+        else:
+            self._send(404, "not found", "text/plain")
+
+class FixtureServer:
+    """Threaded HTTP server on localhost; port 0 picks a free port."""
+
+    def __init__(self, port: int = 0, latency_ms: float = 0):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), FixtureHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.default_latency = latency_ms
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def jobs_url(self, cards: int = 300, page: int = 30, modal: int = 0, latency_ms: float = 0) -> str:
+        return f"{self.base_url}/jobs?cards={cards}&page={page}&modal={modal}&latency={latency_ms}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    args = parser.parse_args()
+    server = FixtureServer(args.port, args.latency_ms)
+    print(f"Serving {server.jobs_url()} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# benchmarks/keyword_matcher.py
+"""
+Compare the compiled KeywordMatcher against the original per-keyword loop.
+Run from the repo root: python -m benchmarks.keyword_matcher [--keywords 50 150 500] [--jobs 1000]
+"""
+import argparse
+import random
+import string
+import time
+from src.keywords import KeywordMatcher
+
+def _word(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10)))
+
+def _naive(keywords, title, description):
+    content = f"{title} {description}".lower()
+    return any((kw.lower() in content) for kw in keywords)
+
+def run(n_keywords, n_jobs, n_words, seed=42):
+    rng = random.Random(seed)
+    keywords = [" ".join(_word(rng) for _ in range(rng.randint(1, 2))) for _ in range(n_keywords)]
+    jobs = []
+    for _ in range(n_jobs):
+        words = [_word(rng) for _ in range(n_words)]
+        if rng.random() < 0.1:
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+        jobs.append((_word(rng).title(), " ".join(words)))
+
+    start = time.perf_counter()
+    naive_hits = sum(_naive(keywords, t, d) for t, d in jobs)
+    naive = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher = KeywordMatcher(keywords)
+    compile_time = time.perf_counter() - start
+    start = time.perf_counter()
+    compiled_hits = sum(bool(matcher.search(t) or matcher.search(d)) for t, d in jobs)
+    compiled = time.perf_counter() - start
+
+    print(f"{n_keywords} keywords x {n_jobs} jobs ({n_words} words each)")
+    print(f"  naive loop : {naive * 1000:8.1f} ms  hits={naive_hits}")
+    print(f"  compiled   : {compiled * 1000:8.1f} ms  hits={compiled_hits}  (compile {compile_time * 1000:.1f} ms)")
+    print(f"  speedup    : {naive / compiled:.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keywords", type=int, nargs="+", default=[50, 150, 500])
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--words", type=int, default=400, help="words per description")
+    args = parser.parse_args()
+    for n in args.keywords:
+        run(n, args.jobs, args.words)
+
+if __name__ == "__main__":
+    main()
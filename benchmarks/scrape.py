@@ -0,0 +1,183 @@
+# benchmarks/scrape.py
+"""
+Offline scrape benchmark: drives load_all_jobs / get_jobs and the DB write path against
+the local fixture server in headless Chromium, then reports jobs/sec, per-card latency
+percentiles and peak memory.
+
+    python -m benchmarks.scrape --cards 300 --latency-ms 50 --modal 10
+    python -m benchmarks.scrape --workers 4 --json results.json
+    python -m benchmarks.scrape --baseline results.json   # exit 1 on regression
+
+Requires playwright with its Chromium build (playwright install chromium).
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from playwright.async_api import async_playwright
+
+from src import database
+from src.glassdoor import stream_jobs_to_db
+from src.keywords import KeywordMatcher
+from src.pages.description_pool import DescriptionPool
+from src.pages.glassdoor_api import JobResponseCapture
+from src.pages.glassdoor_page import GlassdoorPage
+from src.utils import ui
+from .fixture_server import FixtureServer, KEYWORD_WORDS
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+async def _timed(jobs, latencies):
+    """Pass jobs through, recording the time each one took to arrive."""
+    last = time.perf_counter()
+    async for job in jobs:
+        now = time.perf_counter()
+        latencies.append(now - last)
+        last = now
+        yield job
+
+async def _sample_browser_memory(page, peak, stop):
+    """Poll CDP performance metrics for the page's JS heap and DOM node count."""
+    session = await page.context.new_cdp_session(page)
+    await session.send("Performance.enable")
+    while not stop.is_set():
+        metrics = {m["name"]: m["value"] for m in (await session.send("Performance.getMetrics"))["metrics"]}
+        peak["js_heap_mb"] = max(peak.get("js_heap_mb", 0), metrics.get("JSHeapUsedSize", 0) / 1024 / 1024)
+        peak["dom_nodes"] = max(peak.get("dom_nodes", 0), int(metrics.get("Nodes", 0)))
+        try:
+            await asyncio.wait_for(stop.wait(), 0.25)
+        except asyncio.TimeoutError:
+            pass
+
+async def run(args) -> dict:
+    # keyword hits would otherwise pop a blocking message box per job
+    ui.show_msgbox = lambda title, message: None
+
+    tmp = tempfile.mkdtemp(prefix="rpa_bench_")
+    database.DB_PATH = Path(tmp) / "bench.db"
+    database.init_db()
+    country_id = database.get_or_create("countries", "name", "Benchmark")
+    job_title_id = database.get_or_create("job_titles", "title", "fixture")
+
+    tracemalloc.start()
+    result = {"cards": args.cards, "latency_ms": args.latency_ms, "workers": args.workers,
+              "incremental": args.incremental, "capture": args.capture}
+    with FixtureServer() as server:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            context = await browser.new_context()
+            page = await context.new_page()
+            capture = JobResponseCapture().attach(page) if args.capture else None
+            await page.goto(server.jobs_url(args.cards, args.page_size, args.modal, args.latency_ms))
+            gd = GlassdoorPage(page, wait_time=args.wait_time, wait_timeout=args.wait_timeout)
+            if args.modal_guard:
+                await gd.install_modal_guard()
+
+            peak, stop = {}, asyncio.Event()
+            sampler = asyncio.create_task(_sample_browser_memory(page, peak, stop))
+            start = time.perf_counter()
+
+            if not args.incremental:
+                t = time.perf_counter()
+                result["load_more_pages"] = await gd.load_all_jobs()
+                result["load_all_jobs_s"] = time.perf_counter() - t
+
+            pool = DescriptionPool(context, args.workers, args.wait_time, args.wait_timeout,
+                                   modal_guard=args.modal_guard) if args.workers > 1 else None
+            latencies = []
+            try:
+                jobs = gd.get_jobs(keywords=KeywordMatcher(KEYWORD_WORDS), pool=pool, capture=capture,
+                                   incremental=args.incremental, prune=args.prune)
+                writer = await stream_jobs_to_db(_timed(jobs, latencies), country_id, job_title_id)
+            finally:
+                if pool:
+                    await pool.close()
+            elapsed = time.perf_counter() - start
+            result["modals_dismissed_in_page"] = await gd.modal_dismissals() if args.modal_guard else 0
+
+            stop.set()
+            await sampler
+            await browser.close()
+
+    _, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stored = database.get_connection().execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+    database.close_connection()
+
+    result.update({
+        "jobs_stored": stored,
+        "elapsed_s": elapsed,
+        "jobs_per_sec": stored / elapsed if elapsed else 0.0,
+        "card_p50_ms": _percentile(latencies, 50) * 1000,
+        "card_p95_ms": _percentile(latencies, 95) * 1000,
+        "db_rows_per_sec": writer.rows_per_sec,
+        "python_peak_mb": py_peak / 1024 / 1024,
+        "python_maxrss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "browser_js_heap_peak_mb": peak.get("js_heap_mb", 0.0),
+        "browser_dom_nodes_peak": peak.get("dom_nodes", 0),
+        "wait_stats": gd.wait_stats,
+    })
+    return result
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """Regressions beyond tolerance (fraction) for throughput, latency and memory."""
+    checks = (("jobs_per_sec", True), ("card_p95_ms", False), ("browser_js_heap_peak_mb", False), ("python_peak_mb", False))
+    problems = []
+    for key, higher_is_better in checks:
+        old, new = baseline.get(key), result.get(key)
+        if not old or new is None:
+            continue
+        change = (new - old) / old
+        if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+            problems.append(f"{key}: {old:.2f} -> {new:.2f} ({change:+.0%})")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=300)
+    parser.add_argument("--page-size", type=int, default=30)
+    parser.add_argument("--modal", type=int, default=0, help="inject the modal every N interactions (0 = never)")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--workers", type=int, default=1, help="DescriptionPool size (1 = in-page clicks)")
+    parser.add_argument("--incremental", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--prune", default="hide", choices=("hide", "collapse", "off"))
+    parser.add_argument("--capture", action=argparse.BooleanOptionalAction, default=False)
+    parser.add_argument("--modal-guard", action=argparse.BooleanOptionalAction, default=True,
+                        help="dismiss modals in-page (add_init_script) instead of polling for them")
+    parser.add_argument("--wait-time", type=float, default=0.5, help="fixed fallback delay (s)")
+    parser.add_argument("--wait-timeout", type=float, default=5, help="condition wait ceiling (s)")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare against a previous --json file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    for key, value in result.items():
+        if key != "wait_stats":
+            print(f"{key:>24}: {value:.2f}" if isinstance(value, float) else f"{key:>24}: {value}")
+    for name, stat in sorted(result["wait_stats"].items()):
+        print(f"{'wait ' + name:>24}: {stat['count']}x total {stat['total']:.2f}s max {stat['max']:.2f}s timeouts {stat['timeouts']}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2))
+    if args.baseline:
+        problems = compare(result, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for problem in problems:
+            print("REGRESSION", problem)
+        sys.exit(1 if problems else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/startup.py
+"""
+Startup benchmark: time from a fresh interpreter to `import src.main` done and (with
+--navigate) to the first page.goto finishing against the local fixture server, plus
+which desktop-control modules (keyboard, tkinter, ctypes, pywinauto) the import loaded.
+Each sample is a new process, so nothing is cached in sys.modules.
+
+    python -m benchmarks.startup                          # current tree
+    python -m benchmarks.startup --rev HEAD~1 --navigate  # before (HEAD~1) vs after
+
+--rev extracts src/ of that git revision into a temp dir and measures it the same way.
+--navigate requires playwright with its Chromium build (playwright install chromium).
+"""
+
+import argparse
+import io
+import json
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+from .fixture_server import FixtureServer
+
+ROOT = Path(__file__).resolve().parent.parent
+DESKTOP_MODULES = ("keyboard", "tkinter", "ctypes", "pywinauto")
+
+PROBE = """
+import json, sys, time
+t0, url = float(sys.argv[1]), sys.argv[2]
+import src.main
+result = {"import_s": time.time() - t0, "modules": len(sys.modules),
+          "desktop_modules": [m for m in %r if m in sys.modules]}
+if url:
+    import asyncio
+    from playwright.async_api import async_playwright
+    async def navigate():
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            page = await browser.new_page()
+            await page.goto(url)
+            result["first_navigation_s"] = time.time() - t0
+            await browser.close()
+    asyncio.run(navigate())
+print(json.dumps(result))
+""" % (DESKTOP_MODULES,)
+
+def _probe(tree: Path, url: str = "") -> dict:
+    t0 = time.time()
+    proc = subprocess.run([sys.executable, "-c", PROBE, repr(t0), url], cwd=tree, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(f"startup probe failed in {tree}:\n{proc.stderr.strip()}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["process_s"] = time.time() - t0
+    return result
+
+def measure(tree: Path, repeat: int, url: str = "") -> dict:
+    """Median of `repeat` fresh-process samples."""
+    samples = [_probe(tree, url) for _ in range(repeat)]
+    result = {"tree": str(tree), "desktop_modules": samples[-1]["desktop_modules"], "modules": samples[-1]["modules"]}
+    for key in ("import_s", "first_navigation_s", "process_s"):
+        values = [s[key] for s in samples if key in s]
+        if values:
+            result[key] = statistics.median(values)
+    return result
+
+def _extract_revision(rev: str, dest: Path) -> Path:
+    archive = subprocess.run(["git", "archive", rev, "src"], cwd=ROOT, capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(dest)
+    # same .env as the working tree so both load the same settings
+    env = ROOT / ".env"
+    if env.exists():
+        (dest / ".env").write_bytes(env.read_bytes())
+    return dest
+
+def _report(label: str, result: dict):
+    parts = [f"import {result['import_s'] * 1000:.0f}ms"]
+    if "first_navigation_s" in result:
+        parts.append(f"first navigation {result['first_navigation_s'] * 1000:.0f}ms")
+    parts.append(f"{result['modules']} modules")
+    parts.append(f"desktop modules: {', '.join(result['desktop_modules']) or 'none'}")
+    print(f"{label:>8}: " + ", ".join(parts))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rev", help="also measure this git revision (the 'before')")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--navigate", action="store_true", help="also time the first page.goto")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    server = FixtureServer().start() if args.navigate else None
+    try:
+        url = server.jobs_url(cards=30) if server else ""
+        with tempfile.TemporaryDirectory() as tmp:
+            if args.rev:
+                results["before"] = measure(_extract_revision(args.rev, Path(tmp)), args.repeat, url)
+                _report("before", results["before"])
+            results["after"] = measure(ROOT, args.repeat, url)
+            _report("after", results["after"])
+    finally:
+        if server:
+            server.stop()
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
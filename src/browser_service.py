@@ -0,0 +1,82 @@
+# src/browser_service.py
+"""
+Warm browser service: launches the browser once with the persistent profile, logs in to
+Glassdoor, and keeps it running with a CDP endpoint open. Runs with BROWSER_SERVICE_URL
+set (e.g. http://127.0.0.1:9222) attach to it through connect_over_cdp instead of
+launching, maximizing and logging in, so their startup is just the navigation.
+
+    python -m src.browser_service            # leave running; Ctrl+C to stop
+
+Every BROWSER_SERVICE_REFRESH seconds the keep-alive tab is reloaded and the login
+checked, and the storage state is saved to STORAGE_STATE_PATH (when set) for runs that
+don't use the service.
+"""
+
+import argparse
+import asyncio
+from playwright.async_api import async_playwright, Error as PlaywrightError
+from .config import BROWSER, BROWSER_PROFILE_PATH, BROWSER_SERVICE_PORT, BROWSER_SERVICE_REFRESH, HEADLESS, UNATTENDED, STORAGE_STATE_PATH, WAIT_TIME, WAIT_TIMEOUT
+from .pages.glassdoor_page import GlassdoorPage
+from .utils import ui
+
+START_URL = "https://www.glassdoor.co.uk/Job/index.htm"
+
+async def _check_login(page) -> bool:
+    gd = GlassdoorPage(page, wait_time=WAIT_TIME, wait_timeout=WAIT_TIMEOUT)
+    if await gd.is_logged_in():
+        return True
+    if UNATTENDED:
+        print("Browser service: not logged in to Glassdoor; runs will fail until someone logs in")
+        return False
+    await asyncio.to_thread(ui.prompt_user, "RPA Login", "Login required on Glassdoor. Please log in manually and click OK.")
+    return await gd.is_logged_in()
+
+async def _save_state(context):
+    if STORAGE_STATE_PATH:
+        await context.storage_state(path=STORAGE_STATE_PATH)
+
+async def serve(port: int = BROWSER_SERVICE_PORT, refresh: float = BROWSER_SERVICE_REFRESH):
+    async with async_playwright() as p:
+        args = ["--disable-blink-features=AutomationControlled", "--disable-infobars",
+                f"--remote-debugging-port={port}"]
+        context = await p.chromium.launch_persistent_context(
+            user_data_dir=BROWSER_PROFILE_PATH,
+            channel=BROWSER.lower(),
+            headless=HEADLESS,
+            args=args
+        )
+        closed = asyncio.Event()
+        context.on("close", lambda _: closed.set())
+
+        # keep-alive tab: runs open their own pages and never touch this one
+        page = context.pages[0] if context.pages else await context.new_page()
+        await page.goto(START_URL)
+        if await _check_login(page):
+            await _save_state(context)
+        print(f"Browser service ready: set BROWSER_SERVICE_URL=http://127.0.0.1:{port}")
+
+        while not closed.is_set():
+            try:
+                await asyncio.wait_for(closed.wait(), timeout=refresh)
+            except asyncio.TimeoutError:
+                try:
+                    await page.reload()
+                    if await _check_login(page):
+                        await _save_state(context)
+                except PlaywrightError as e:
+                    print("Browser service: session check failed:", e)
+        print("Browser service: browser closed")
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep a logged-in browser running for scraper runs")
+    parser.add_argument("--port", type=int, default=BROWSER_SERVICE_PORT, help="CDP port runs connect to")
+    parser.add_argument("--refresh", type=float, default=BROWSER_SERVICE_REFRESH,
+                        help="seconds between keep-alive reloads / login checks")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.port, args.refresh))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
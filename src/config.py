@@ -1,5 +1,6 @@
 from dotenv import load_dotenv
 import os
+import sys
 import getpass
 
 load_dotenv()
@@ -9,8 +10,54 @@ SEARCH_TERM = os.getenv("SEARCH_TERM", "visa sponsorship")
 USE_PERSISTENT_BROWSER = os.getenv("USE_PERSISTENT_BROWSER", "False") == "True"
 BROWSER = os.getenv("BROWSER", "EDGE").upper()
 WAIT_TIME = float(os.getenv("WAIT_TIME", 3))
+WAIT_TIMEOUT = float(os.getenv("WAIT_TIMEOUT", 10))
 DEBUG = os.getenv("DEBUG", "False") == "True"
+HEADLESS = os.getenv("HEADLESS", "False") == "True"
+# unattended: no dialogs or hotkeys; review notices go to the review_queue table
+UNATTENDED = os.getenv("UNATTENDED", str(HEADLESS)) == "True"
+# saved login (Playwright storage_state JSON); written after a manual login, loaded on start
+STORAGE_STATE_PATH = os.getenv("STORAGE_STATE_PATH", "")
 FROM_AGE = int(os.getenv("FROM_AGE", 14))
+# delta crawl: narrow fromAge to the time since the last successful run and stop paging
+# at the first page of already-known jobs (FROM_AGE stays the upper bound)
+DELTA_CRAWL = os.getenv("DELTA_CRAWL", "True") == "True"
+WATERMARK_IDS = int(os.getenv("WATERMARK_IDS", 200))
 
 CURRENT_USER = getpass.getuser()
-BROWSER_PROFILE_PATH = f"C:/Users/{CURRENT_USER}/AppData/Local/RPA_Browser_Profile"
+
+def _default_profile_path():
+    """Per-user data dir for the persistent browser profile on each platform."""
+    if sys.platform == "win32":
+        base = os.getenv("LOCALAPPDATA") or f"C:/Users/{CURRENT_USER}/AppData/Local"
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Application Support")
+    else:
+        base = os.getenv("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(base, "RPA_Browser_Profile")
+
+BROWSER_PROFILE_PATH = os.getenv("BROWSER_PROFILE_PATH") or _default_profile_path()
+# warm browser service (python -m src.browser_service); runs connect to it when the URL is set
+BROWSER_SERVICE_PORT = int(os.getenv("BROWSER_SERVICE_PORT", 9222))
+BROWSER_SERVICE_URL = os.getenv("BROWSER_SERVICE_URL", "")
+BROWSER_SERVICE_REFRESH = float(os.getenv("BROWSER_SERVICE_REFRESH", 1800))  # seconds between session checks
+
+DB_BATCH_SIZE = int(os.getenv("DB_BATCH_SIZE", 50))
+DB_FLUSH_INTERVAL = float(os.getenv("DB_FLUSH_INTERVAL", 5))
+COMPRESS_DESCRIPTIONS = os.getenv("COMPRESS_DESCRIPTIONS", "False") == "True"  # zlib, decoded on read
+DESCRIPTION_WORKERS = int(os.getenv("DESCRIPTION_WORKERS", 1))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", 100))
+SEARCH_CONCURRENCY = int(os.getenv("SEARCH_CONCURRENCY", 2))
+NETWORK_PROFILE = os.getenv("NETWORK_PROFILE", "glassdoor")
+NETWORK_BLOCK_TYPES = [t for t in os.getenv("NETWORK_BLOCK_TYPES", "").split(",") if t.strip()]
+NETWORK_BLOCK_DOMAINS = [d for d in os.getenv("NETWORK_BLOCK_DOMAINS", "").split(",") if d.strip()]
+CAPTURE_RESPONSES = os.getenv("CAPTURE_RESPONSES", "True") == "True"
+INCREMENTAL_HARVEST = os.getenv("INCREMENTAL_HARVEST", "True") == "True"
+STORE_MATCHED_JOBS = os.getenv("STORE_MATCHED_JOBS", "True") == "True"  # keep keyword-matched jobs (see job_keyword_matches)
+# near-duplicate postings (MinHash estimate of shingle Jaccard similarity at or above this)
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", 0.8))
+SKIP_DUPLICATES = os.getenv("SKIP_DUPLICATES", "True") == "True"  # stored, but not reported for review
+MODAL_GUARD = os.getenv("MODAL_GUARD", "True") == "True"  # dismiss modals in-page instead of polling for them
+# collapse also empties the cards React still renders; opt-in until checked on the live site
+PRUNE_CARDS = os.getenv("PRUNE_CARDS", "hide").lower()  # hide | collapse | off
+TRACE = os.getenv("TRACE", str(DEBUG)) == "True"
+TRACE_JSON = os.getenv("TRACE_JSON", "")
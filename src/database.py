@@ -1,11 +1,69 @@
 from pathlib import Path
 import sqlite3
+import threading
+import time
 from datetime import datetime
+import json
+import re
+import zlib
+from .config import DB_BATCH_SIZE, DB_FLUSH_INTERVAL, COMPRESS_DESCRIPTIONS, DEDUP_THRESHOLD
+from .dedup import LshIndex, dedup_text, job_signature, signature, band_buckets, similarity, to_blob, from_blob
+from .keywords import KeywordMatcher, MATCH_SUBSTRING
+from .utils.tracing import traced
 
 DB_PATH = Path(__file__).resolve().parent.parent / "data" / "jobsearch.db"
 
+_conn = None
+_conn_lock = threading.Lock()
+
 def get_connection():
-    return sqlite3.connect(DB_PATH)
+    """Return the process-wide connection, opening it (in WAL mode) on first use."""
+    global _conn
+    with _conn_lock:
+        if _conn is None:
+            DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+            _conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+            _conn.execute("PRAGMA journal_mode=WAL")
+            _conn.execute("PRAGMA synchronous=NORMAL")
+        return _conn
+
+def encode_description(text, compress: bool = COMPRESS_DESCRIPTIONS):
+    """Description as stored in jobs.description: zlib BLOB when compressing pays off, else TEXT."""
+    if not compress or not text:
+        return text
+    packed = zlib.compress(text.encode("utf-8"), 6)
+    return packed if len(packed) < len(text) else text
+
+def decode_description(value):
+    """Inverse of encode_description; rows may hold either form."""
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode("utf-8")
+    return value
+
+def close_connection():
+    global _conn
+    with _conn_lock:
+        if _conn is not None:
+            _conn.close()
+            _conn = None
+    # keyed by job_title_id, which means nothing in another database
+    _matchers.clear()
+
+def use_database(path):
+    """Switch to another database file (the current connection is closed)."""
+    global DB_PATH
+    close_connection()
+    DB_PATH = Path(path)
+
+def backup_database(dest):
+    """Consistent copy of the database to `dest` (SQLite online backup, safe while in use)."""
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    target = sqlite3.connect(dest)
+    try:
+        get_connection().backup(target)
+    finally:
+        target.close()
 
 def init_db():
     conn = get_connection()
@@ -32,6 +90,7 @@ def init_db():
         location TEXT,
         description TEXT,
         date_scraped TEXT,
+        listing_id TEXT,
         FOREIGN KEY(country_id) REFERENCES countries(id),
         FOREIGN KEY(job_title_id) REFERENCES job_titles(id)
     )
@@ -48,64 +107,802 @@ def init_db():
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         job_title_id INTEGER,
         keyword TEXT,
+        match_mode TEXT NOT NULL DEFAULT 'substring',
+        FOREIGN KEY(job_title_id) REFERENCES job_titles(id)
+    )
+    """)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS scrape_checkpoints (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        country TEXT,
+        search_term TEXT,
+        filtered_url TEXT,
+        pages_loaded INTEGER NOT NULL DEFAULT 0,
+        status TEXT NOT NULL DEFAULT 'started',
+        updated_at TEXT,
+        UNIQUE(country, search_term)
+    )
+    """)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS checkpoint_listings (
+        checkpoint_id INTEGER,
+        listing_id TEXT,
+        PRIMARY KEY(checkpoint_id, listing_id),
+        FOREIGN KEY(checkpoint_id) REFERENCES scrape_checkpoints(id)
+    )
+    """)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS crawl_watermarks (
+        country_id INTEGER,
+        job_title_id INTEGER,
+        last_success_at TEXT,
+        newest_listing_ids TEXT,
+        PRIMARY KEY(country_id, job_title_id),
+        FOREIGN KEY(country_id) REFERENCES countries(id),
         FOREIGN KEY(job_title_id) REFERENCES job_titles(id)
     )
     """)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS export_state (
+        target TEXT PRIMARY KEY,
+        last_date_scraped TEXT,
+        last_job_id INTEGER,
+        rows_exported INTEGER,
+        exported_at TEXT
+    )
+    """)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        started_at TEXT,
+        finished_at TEXT,
+        elapsed_s REAL,
+        status TEXT,
+        jobs_saved INTEGER,
+        counters TEXT
+    )
+    """)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS run_stages (
+        run_id INTEGER,
+        stage TEXT,
+        count INTEGER,
+        total_s REAL,
+        mean_s REAL,
+        p50_s REAL,
+        p95_s REAL,
+        max_s REAL,
+        PRIMARY KEY(run_id, stage),
+        FOREIGN KEY(run_id) REFERENCES runs(id)
+    )
+    """)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS review_queue (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT,
+        message TEXT,
+        listing_id TEXT,
+        title TEXT,
+        company TEXT,
+        created_at TEXT,
+        reviewed_at TEXT
+    )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_review_queue_pending ON review_queue(reviewed_at)")
+    _add_missing_columns(cur, "jobs", {"description": "TEXT", "listing_id": "TEXT"})
+    _add_missing_columns(cur, "title_keywords", {"match_mode": "TEXT NOT NULL DEFAULT 'substring'"})
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_listing_id ON jobs(listing_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_job_title_id ON jobs(job_title_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jobs_date_scraped ON jobs(date_scraped, id)")
+    _init_jobs_fts(cur)
+    _init_keyword_matches(cur)
+    _init_duplicates(cur)
+    if COMPRESS_DESCRIPTIONS:
+        _compress_existing_descriptions(cur)
     conn.commit()
-    conn.close()
 
+def _init_jobs_fts(cur):
+    """
+    Full-text index over jobs (title, company, description). It is contentless (the text
+    already lives in jobs, possibly compressed) and kept in sync from Python by the
+    writers here (see _sync_jobs_fts) rather than by triggers, so the schema doesn't
+    depend on functions only this module defines and other clients can still write jobs.
+    What they write is picked up here: new jobs are indexed, and rows they deleted make
+    the index be rebuilt (a contentless index can only drop a row given its old text).
+    """
+    cur.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, company, description, content='', tokenize='unicode61 remove_diacritics 2'
+    )
+    """)
+    # triggers of earlier versions called job_text(), which other connections lack
+    for trigger in ("jobs_fts_insert", "jobs_fts_delete", "jobs_fts_update"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    if cur.execute("SELECT 1 FROM jobs_fts WHERE rowid NOT IN (SELECT id FROM jobs) LIMIT 1").fetchone():
+        cur.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('delete-all')")
+        print("DB: jobs were deleted outside the scraper; rebuilding the full-text index")
+    rows = cur.execute("""
+    SELECT id, title, company, description FROM jobs WHERE id NOT IN (SELECT rowid FROM jobs_fts)
+    """).fetchall()
+    if rows:
+        _sync_jobs_fts(cur, [], rows)
+        print(f"DB: indexed {len(rows)} existing jobs for full-text search")
+
+def _sync_jobs_fts(conn, previous, current):
+    """
+    Bring jobs_fts up to date with freshly written jobs.
+    previous: the (id, title, company, description) the rows had before the write, as
+              indexed; current: (id, title, company, description) written, the last per id
+              wins. Descriptions may be stored (compressed) values.
+    """
+    conn.executemany("INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description) VALUES ('delete', ?, ?, ?, ?)",
+                     [(job_id, title, company, decode_description(description))
+                      for job_id, title, company, description in previous])
+    latest = {job_id: (job_id, title, company, decode_description(description))
+              for job_id, title, company, description in current}
+    conn.executemany("INSERT INTO jobs_fts(rowid, title, company, description) VALUES (?, ?, ?, ?)", latest.values())
+
+def _indexed_rows(conn, listing_ids):
+    """Stored (id, title, company, description) of these listings that jobs_fts holds, before they're overwritten."""
+    listing_ids = list({l for l in listing_ids if l})
+    if not listing_ids:
+        return []
+    rows = conn.execute(f"""
+    SELECT id, title, company, description FROM jobs WHERE listing_id IN ({', '.join('?' * len(listing_ids))})
+    """, listing_ids).fetchall()
+    if not rows:
+        return []
+    # rowid lookups only: a subquery over jobs_fts would scan the whole index on every flush
+    indexed = {r[0] for r in conn.execute(
+        f"SELECT rowid FROM jobs_fts WHERE rowid IN ({', '.join('?' * len(rows))})", [r[0] for r in rows])}
+    return [r for r in rows if r[0] in indexed]
+
+def _init_keyword_matches(cur):
+    """
+    Materialized (job, keyword) matches for the keywords of each job's title, so matched
+    jobs can be stored and unmatched ones found with an index lookup. Kept up to date by
+    JobWriter (new jobs) and add/remove_keyword_for_title (new or removed keywords).
+    """
+    exists = cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'job_keyword_matches'").fetchone()
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS job_keyword_matches (
+        job_id INTEGER,
+        keyword_id INTEGER,
+        PRIMARY KEY(job_id, keyword_id),
+        FOREIGN KEY(job_id) REFERENCES jobs(id),
+        FOREIGN KEY(keyword_id) REFERENCES title_keywords(id)
+    ) WITHOUT ROWID
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_job_keyword_matches_keyword ON job_keyword_matches(keyword_id)")
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS jobs_keyword_matches_delete AFTER DELETE ON jobs BEGIN
+        DELETE FROM job_keyword_matches WHERE job_id = old.id;
+    END
+    """)
+    if not exists:
+        # one-off backfill for databases created before the table existed
+        for (keyword_id, job_title_id, keyword, mode) in cur.execute(
+                "SELECT id, job_title_id, keyword, match_mode FROM title_keywords").fetchall():
+            _match_keyword(cur, keyword_id, job_title_id, keyword, mode)
+
+def _init_duplicates(cur):
+    """
+    Near-duplicate index (see dedup.py): each job's MinHash signature and cluster (the id
+    of the first stored job of its group of near-duplicates), and its LSH band buckets,
+    which is where candidate duplicates are looked up. JobWriter clusters new jobs as it
+    writes them; jobs without any text are left out. Backfilled once, oldest job first.
+    """
+    exists = cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'job_signatures'").fetchone()
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS job_signatures (
+        job_id INTEGER PRIMARY KEY,
+        signature BLOB,
+        cluster_id INTEGER,
+        FOREIGN KEY(job_id) REFERENCES jobs(id)
+    )
+    """)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS job_lsh_buckets (
+        band INTEGER,
+        bucket INTEGER,
+        job_id INTEGER,
+        PRIMARY KEY(band, bucket, job_id),
+        FOREIGN KEY(job_id) REFERENCES jobs(id)
+    ) WITHOUT ROWID
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_job_signatures_cluster ON job_signatures(cluster_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_job_lsh_buckets_job ON job_lsh_buckets(job_id)")
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS jobs_duplicates_delete AFTER DELETE ON jobs BEGIN
+        DELETE FROM job_lsh_buckets WHERE job_id = old.id;
+        DELETE FROM job_signatures WHERE job_id = old.id;
+    END
+    """)
+    if not exists:
+        rows = cur.execute("SELECT id, title, company, description FROM jobs ORDER BY id").fetchall()
+        _index_duplicates(cur, [(job_id, signature(dedup_text({"title": title, "company": company,
+                                                               "description": decode_description(description)})))
+                                for job_id, title, company, description in rows])
+        indexed, clusters = cur.execute("SELECT COUNT(*), COUNT(DISTINCT cluster_id) FROM job_signatures").fetchone()
+        print(f"DB: indexed {indexed} existing jobs for near-duplicate detection ({clusters} distinct)")
+
+def _compress_existing_descriptions(cur):
+    """Migrate descriptions stored as plain text by earlier runs (or with compression off)."""
+    rows = cur.execute("SELECT id, description FROM jobs WHERE typeof(description) = 'text' AND description != ''").fetchall()
+    packed = [(encode_description(text, compress=True), job_id) for job_id, text in rows]
+    packed = [(value, job_id) for value, job_id in packed if isinstance(value, bytes)]
+    if packed:
+        cur.executemany("UPDATE jobs SET description = ? WHERE id = ?", packed)
+        print(f"DB: compressed {len(packed)} stored descriptions (VACUUM to reclaim the space)")
+
+def _add_missing_columns(cur, table, columns):
+    """Bring tables created by older versions up to date (CREATE TABLE IF NOT EXISTS won't)."""
+    existing = {row[1] for row in cur.execute(f"PRAGMA table_info({table})")}
+    for name, decl in columns.items():
+        if name not in existing:
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+@traced("db.get_or_create")
 def get_or_create(table, column, value):
     conn = get_connection()
     cur = conn.cursor()
     cur.execute(f"SELECT id FROM {table} WHERE {column} = ?", (value,))
     row = cur.fetchone()
     if row:
-        id_ = row[0]
-    else:
-        cur.execute(f"INSERT INTO {table} ({column}) VALUES (?)", (value,))
-        conn.commit()
-        id_ = cur.lastrowid
-    conn.close()
-    return id_
+        return row[0]
+    cur.execute(f"INSERT INTO {table} ({column}) VALUES (?)", (value,))
+    conn.commit()
+    return cur.lastrowid
+
+# Jobs without a listing_id (NULL) never conflict, so they are always inserted.
+_INSERT_JOB_SQL = """
+    INSERT INTO jobs (country_id, job_title_id, title, company, location, description, date_scraped, listing_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(listing_id) DO UPDATE SET
+        title = excluded.title,
+        company = excluded.company,
+        location = excluded.location,
+        description = excluded.description,
+        date_scraped = excluded.date_scraped
+"""
+
+def _match_fields(job):
+    """
+    What keywords are matched against: the title and the (plain) description, each on its
+    own, so a phrase can't run from the end of the title into the description (jobs_fts,
+    which add_keyword_for_title relies on, doesn't match across columns either).
+    """
+    return (job.get("title") or "", job.get("description") or "")
+
+def _job_row(country_id, job_title_id, job):
+    return (country_id, job_title_id, job.get("title", ""), job.get("company", ""),
+            job.get("location", ""), encode_description(job.get("description", "")), datetime.now().isoformat(),
+            job.get("listing_id") or None)
 
-def insert_job(country_id, job_title_id, title, company, location, description):
+def insert_job(country_id, job_title_id, title, company, location, description, listing_id=None):
+    """Upsert and commit a single job. Prefer insert_jobs / JobWriter for scraped batches."""
     conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("""
-    INSERT INTO jobs (country_id, job_title_id, title, company, location, description, date_scraped)
-    VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (country_id, job_title_id, title, company, location, description, datetime.now().isoformat()))
-    conn.commit()
-    conn.close()
+    job = {"title": title, "company": company, "location": location, "description": description, "listing_id": listing_id}
+    sig = job_signature(job)
+    row = _job_row(country_id, job_title_id, job)
+    with conn:
+        previous = _indexed_rows(conn, [listing_id])
+        job_id = conn.execute(_INSERT_JOB_SQL + " RETURNING id", row).fetchone()[0]
+        _sync_jobs_fts(conn, previous, [(job_id, row[2], row[3], row[5])])
+        _write_keyword_matches(conn, job_title_id, [(job_id, _match_fields(job))])
+        _index_duplicates(conn, [(job_id, sig)])
+
+class JobWriter:
+    """
+    Buffers scraped jobs and writes them on the shared connection, one upsert per row
+    with RETURNING id, since the full-text index, job_keyword_matches and the duplicate
+    index all need the ids. The buffer is flushed (one transaction) when it reaches
+    batch_size rows or when flush_interval seconds have passed since the last flush,
+    whichever comes first. Each flush also updates the full-text index, records the
+    jobs' keyword matches and clusters them with their stored near-duplicates
+    (signatures are computed before, outside the write transaction, and only once per
+    job dict).
+    Jobs not flushed yet (checked with check_duplicate, or buffered by add) are kept in an
+    in-memory LSH index, so check_duplicate also finds copies seen moments ago in this run.
+    add/flush are thread-safe so an exit hook can flush from the hotkey thread.
+    """
+
+    def __init__(self, country_id, job_title_id, batch_size: int = DB_BATCH_SIZE, flush_interval: float = DB_FLUSH_INTERVAL):
+        self.country_id = country_id
+        self.job_title_id = job_title_id
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self.write_seconds = 0.0
+        self._buffer = []
+        self._pending = LshIndex()
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _pending_key(job):
+        return job.get("listing_id") or id(job)
+
+    @traced("db.check_duplicate")
+    def check_duplicate(self, job: dict, threshold: float = DEDUP_THRESHOLD):
+        """
+        Reference to a near-duplicate of a scraped job among the jobs not written yet
+        ("listing <id>") or the stored ones ("job <cluster id>"), or None. The job is then
+        tracked as pending itself, since it is about to be added.
+        """
+        sig = job_signature(job)
+        if sig is None:
+            return None
+        key = self._pending_key(job)
+        with self._lock:
+            best = self._pending.best(sig, threshold, exclude=key)
+            self._pending.add(key, sig)
+        if best:
+            return f"listing {best[0]}"
+        cluster_id = find_duplicate(job, threshold)
+        return f"job {cluster_id}" if cluster_id is not None else None
+
+    def add(self, job: dict):
+        with self._lock:
+            key, sig = self._pending_key(job), job_signature(job)
+            self._pending.add(key, sig)
+            self._buffer.append((_job_row(self.country_id, self.job_title_id, job), _match_fields(job), sig, key))
+            if len(self._buffer) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+
+    @traced("db.flush")
+    def flush(self) -> int:
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._buffer:
+                return 0
+            rows, self._buffer = self._buffer, []
+            conn = get_connection()
+            start = time.perf_counter()
+            with conn:
+                previous = _indexed_rows(conn, [row[7] for row, _, _, _ in rows])
+                # RETURNING gives the id of the inserted or upserted row, which executemany can't
+                job_ids = [conn.execute(_INSERT_JOB_SQL + " RETURNING id", row).fetchone()[0] for row, _, _, _ in rows]
+                _sync_jobs_fts(conn, previous, [(job_id, row[2], row[3], row[5]) for job_id, (row, _, _, _) in zip(job_ids, rows)])
+                _write_keyword_matches(conn, self.job_title_id, zip(job_ids, (text for _, text, _, _ in rows)))
+                _index_duplicates(conn, zip(job_ids, (sig for _, _, sig, _ in rows)))
+            # in the database now, where find_duplicate sees them
+            for *_, key in rows:
+                self._pending.remove(key)
+            self.write_seconds += time.perf_counter() - start
+            self.rows_written += len(rows)
+            return len(rows)
+
+    def close(self):
+        self.flush()
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows_written / self.write_seconds if self.write_seconds else 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def insert_jobs(country_id, job_title_id, jobs, batch_size: int = DB_BATCH_SIZE) -> JobWriter:
+    """Bulk insert an iterable of job dicts. Returns the writer so callers can read its stats."""
+    with JobWriter(country_id, job_title_id, batch_size=batch_size) as writer:
+        for job in jobs:
+            writer.add(job)
+    print(f"DB: wrote {writer.rows_written} jobs in {writer.write_seconds:.3f}s ({writer.rows_per_sec:.0f} rows/sec)")
+    return writer
+
+@traced("db.get_seen_listing_ids")
+def get_seen_listing_ids(scraped_before=None):
+    """
+    All listing ids already stored, used to skip cards before opening their description.
+    scraped_before: only jobs scraped up to this datetime (e.g. a crawl watermark).
+    """
+    conn = get_connection()
+    sql = "SELECT listing_id FROM jobs WHERE listing_id IS NOT NULL"
+    params = ()
+    if scraped_before is not None:
+        sql += " AND date_scraped <= ?"
+        params = (scraped_before.isoformat(),)
+    rows = conn.execute(sql, params).fetchall()
+    return {r[0] for r in rows}
 
 def get_search_params():
     conn = get_connection()
     cur = conn.cursor()
     cur.execute("SELECT country, search_term FROM search_params ORDER BY id LIMIT 1")
     row = cur.fetchone()
-    conn.close()
     if row:
         return row[0], row[1]
     return None
 
+def get_all_search_params():
+    """Every configured (country, search_term) pair, in insertion order."""
+    conn = get_connection()
+    rows = conn.execute("SELECT country, search_term FROM search_params ORDER BY id").fetchall()
+    return [(r[0], r[1]) for r in rows]
+
 def add_search_params(country, search_term):
     conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("INSERT INTO search_params (country, search_term) VALUES (?, ?)", (country, search_term))
+    conn.execute("INSERT INTO search_params (country, search_term) VALUES (?, ?)", (country, search_term))
     conn.commit()
-    conn.close()
 
-def add_keyword_for_title(job_title_id, keyword):
+def add_keyword_for_title(job_title_id, keyword, match_mode="substring"):
+    """match_mode: 'substring' (default), 'word' or 'phrase' -- see keywords.keyword_pattern."""
     conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("INSERT INTO title_keywords (job_title_id, keyword) VALUES (?, ?)", (job_title_id, keyword))
-    conn.commit()
-    conn.close()
+    with conn:
+        cur = conn.execute("INSERT INTO title_keywords (job_title_id, keyword, match_mode) VALUES (?, ?, ?)",
+                           (job_title_id, keyword, match_mode))
+        matched = _match_keyword(conn, cur.lastrowid, job_title_id, keyword, match_mode)
+    _matchers.pop(job_title_id, None)
+    print(f"DB: keyword '{keyword}' matches {matched} stored jobs")
+    return cur.lastrowid
 
 def get_keywords_for_title(job_title_id):
     conn = get_connection()
     cur = conn.cursor()
     cur.execute("SELECT keyword FROM title_keywords WHERE job_title_id = ?", (job_title_id,))
     rows = cur.fetchall()
-    conn.close()
     return [r[0] for r in rows] if rows else []
+
+def remove_keyword_for_title(job_title_id, keyword, match_mode=None):
+    """Remove a keyword (in any mode unless match_mode is given) and its matches. Returns rows removed."""
+    conn = get_connection()
+    sql = "SELECT id FROM title_keywords WHERE job_title_id = ? AND keyword = ?"
+    params = [job_title_id, keyword]
+    if match_mode:
+        sql += " AND match_mode = ?"
+        params.append(match_mode)
+    keyword_ids = [(r[0],) for r in conn.execute(sql, params).fetchall()]
+    with conn:
+        conn.executemany("DELETE FROM job_keyword_matches WHERE keyword_id = ?", keyword_ids)
+        conn.executemany("DELETE FROM title_keywords WHERE id = ?", keyword_ids)
+    _matchers.pop(job_title_id, None)
+    return len(keyword_ids)
+
+@traced("db.get_keyword_rules")
+def get_keyword_rules(job_title_id):
+    """(keyword, match_mode) pairs for a job title, ready for KeywordMatcher."""
+    conn = get_connection()
+    rows = conn.execute("SELECT keyword, match_mode FROM title_keywords WHERE job_title_id = ?", (job_title_id,)).fetchall()
+    return [(r[0], r[1]) for r in rows]
+
+# job_title_id -> (KeywordMatcher, {(keyword, mode): [keyword ids]}); reset when keywords change
+_matchers = {}
+
+def _title_matcher(conn, job_title_id):
+    if job_title_id not in _matchers:
+        ids = {}
+        for keyword_id, keyword, mode in conn.execute(
+                "SELECT id, keyword, match_mode FROM title_keywords WHERE job_title_id = ?", (job_title_id,)):
+            ids.setdefault((keyword, mode or MATCH_SUBSTRING), []).append(keyword_id)
+        _matchers[job_title_id] = (KeywordMatcher(ids), ids)
+    return _matchers[job_title_id]
+
+def _write_keyword_matches(conn, job_title_id, jobs):
+    """(Re)compute the matches of freshly written jobs: iterable of (job_id, match fields)."""
+    matcher, ids = _title_matcher(conn, job_title_id)
+    jobs = list(jobs)
+    conn.executemany("DELETE FROM job_keyword_matches WHERE job_id = ?", [(job_id,) for job_id, _ in jobs])
+    if not matcher:
+        return
+    conn.executemany("INSERT OR IGNORE INTO job_keyword_matches (job_id, keyword_id) VALUES (?, ?)",
+                     [(job_id, keyword_id) for job_id, fields in jobs
+                      for rule in {rule for text in fields for rule in matcher.find_rules(text)}
+                      for keyword_id in ids.get(rule, ())])
+
+def _match_keyword(conn, keyword_id, job_title_id, keyword, mode):
+    """
+    Record which stored jobs of the title match one (new) keyword. Word/phrase keywords
+    only check the jobs_fts hits for the keyword's terms (a superset of the real matches);
+    substring keywords can hit inside words, so they check every job of the title.
+    """
+    matcher = KeywordMatcher([(keyword, mode)])
+    if not matcher:
+        return 0
+    if mode != MATCH_SUBSTRING and re.search(r"[^\W_]", keyword):
+        rows = conn.execute("""
+        SELECT j.id, j.title, j.description FROM jobs_fts
+        JOIN jobs j ON j.id = jobs_fts.rowid
+        WHERE jobs_fts MATCH ? AND j.job_title_id = ?
+        """, ('{title description} : "%s"' % keyword.replace('"', '""'), job_title_id))
+    else:
+        rows = conn.execute("SELECT id, title, description FROM jobs WHERE job_title_id = ?", (job_title_id,))
+    matches = [(job_id, keyword_id) for job_id, title, description in rows.fetchall()
+               if any(matcher.search(text) for text in _match_fields({"title": title, "description": decode_description(description)}))]
+    conn.executemany("INSERT OR IGNORE INTO job_keyword_matches (job_id, keyword_id) VALUES (?, ?)", matches)
+    return len(matches)
+
+def _candidate_duplicates(conn, buckets):
+    """Stored (job_id, cluster_id, signature) sharing at least one band bucket."""
+    where = " OR ".join(["(b.band = ? AND b.bucket = ?)"] * len(buckets))
+    return conn.execute(f"""
+    SELECT DISTINCT s.job_id, s.cluster_id, s.signature FROM job_lsh_buckets b
+    JOIN job_signatures s ON s.job_id = b.job_id
+    WHERE {where}
+    """, [value for bucket in buckets for value in bucket]).fetchall()
+
+def _best_duplicate(conn, sig, buckets, threshold, exclude=None):
+    """(job_id, cluster_id, similarity) of the most similar stored job at or above threshold, or None."""
+    best = None
+    for job_id, cluster_id, blob in _candidate_duplicates(conn, buckets):
+        if job_id == exclude:
+            continue
+        score = similarity(sig, from_blob(blob))
+        if score >= threshold and (best is None or score > best[2]):
+            best = (job_id, cluster_id, score)
+    return best
+
+def _index_duplicates(conn, jobs, threshold: float = DEDUP_THRESHOLD):
+    """
+    (Re)index freshly written jobs, iterable of (job_id, signature or None): each joins the
+    cluster of its most similar stored job, or starts its own. Jobs are added one at a
+    time, so duplicates within the same batch find each other.
+    """
+    for job_id, sig in jobs:
+        conn.execute("DELETE FROM job_lsh_buckets WHERE job_id = ?", (job_id,))
+        conn.execute("DELETE FROM job_signatures WHERE job_id = ?", (job_id,))
+        if sig is None:
+            continue
+        buckets = band_buckets(sig)
+        best = _best_duplicate(conn, sig, buckets, threshold, exclude=job_id)
+        conn.execute("INSERT INTO job_signatures (job_id, signature, cluster_id) VALUES (?, ?, ?)",
+                     (job_id, to_blob(sig), best[1] if best else job_id))
+        conn.executemany("INSERT OR IGNORE INTO job_lsh_buckets (band, bucket, job_id) VALUES (?, ?, ?)",
+                         [(band, bucket, job_id) for band, bucket in buckets])
+
+@traced("db.find_duplicate")
+def find_duplicate(job, threshold: float = DEDUP_THRESHOLD):
+    """
+    Cluster id of a stored near-duplicate of a (not yet stored) job dict, or None.
+    The job's own row, when its listing is already stored, doesn't count.
+    """
+    sig = job_signature(job)
+    if sig is None:
+        return None
+    conn = get_connection()
+    exclude = None
+    if job.get("listing_id"):
+        row = conn.execute("SELECT id FROM jobs WHERE listing_id = ?", (job["listing_id"],)).fetchone()
+        exclude = row[0] if row else None
+    best = _best_duplicate(conn, sig, band_buckets(sig), threshold, exclude=exclude)
+    return best[1] if best else None
+
+_DUPLICATE_COLUMNS = ("id", "listing_id", "title", "company", "location", "date_scraped")
+
+def get_duplicate_clusters(min_size: int = 2):
+    """Groups of near-duplicate jobs (lists of dicts, first stored job first), largest first."""
+    rows = get_connection().execute(f"""
+    SELECT s.cluster_id, {', '.join('j.' + c for c in _DUPLICATE_COLUMNS)} FROM job_signatures s
+    JOIN jobs j ON j.id = s.job_id
+    WHERE s.cluster_id IN (SELECT cluster_id FROM job_signatures GROUP BY cluster_id HAVING COUNT(*) >= ?)
+    ORDER BY s.cluster_id, j.id
+    """, (min_size,)).fetchall()
+    clusters = {}
+    for cluster_id, *values in rows:
+        clusters.setdefault(cluster_id, []).append(dict(zip(_DUPLICATE_COLUMNS, values)))
+    return sorted(clusters.values(), key=len, reverse=True)
+
+_UNMATCHED_COLUMNS = ("id", "listing_id", "title", "company", "location", "description", "date_scraped")
+
+def get_unmatched_jobs(job_title_id=None, limit=None, distinct: bool = False):
+    """
+    Stored jobs none of their title's keywords match, newest first (index lookups only).
+    distinct: leave out near-duplicates of an earlier stored job (one job per cluster).
+    """
+    sql = f"""
+    SELECT {', '.join('j.' + c for c in _UNMATCHED_COLUMNS)} FROM jobs j
+    WHERE NOT EXISTS (SELECT 1 FROM job_keyword_matches m WHERE m.job_id = j.id)
+    """
+    if distinct:
+        sql += " AND NOT EXISTS (SELECT 1 FROM job_signatures s WHERE s.job_id = j.id AND s.cluster_id != j.id)"
+    params = []
+    if job_title_id is not None:
+        sql += " AND j.job_title_id = ?"
+        params.append(job_title_id)
+    sql += " ORDER BY j.date_scraped DESC"
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    rows = get_connection().execute(sql, params).fetchall()
+    jobs = [dict(zip(_UNMATCHED_COLUMNS, r)) for r in rows]
+    for job in jobs:
+        job["description"] = decode_description(job["description"])
+    return jobs
+
+def get_matched_keywords(job_id):
+    rows = get_connection().execute("""
+    SELECT k.keyword FROM job_keyword_matches m JOIN title_keywords k ON k.id = m.keyword_id
+    WHERE m.job_id = ? ORDER BY k.keyword
+    """, (job_id,)).fetchall()
+    return [r[0] for r in rows]
+
+_CHECKPOINT_COLUMNS = ("id", "country", "search_term", "filtered_url", "pages_loaded", "status", "updated_at")
+
+def get_checkpoint(country, search_term):
+    conn = get_connection()
+    row = conn.execute(f"SELECT {', '.join(_CHECKPOINT_COLUMNS)} FROM scrape_checkpoints WHERE country = ? AND search_term = ?",
+                       (country, search_term)).fetchone()
+    return dict(zip(_CHECKPOINT_COLUMNS, row)) if row else None
+
+def get_unfinished_checkpoints():
+    conn = get_connection()
+    rows = conn.execute(f"SELECT {', '.join(_CHECKPOINT_COLUMNS)} FROM scrape_checkpoints WHERE status != 'done' ORDER BY id").fetchall()
+    return [dict(zip(_CHECKPOINT_COLUMNS, r)) for r in rows]
+
+def start_checkpoint(country, search_term, resume=False):
+    """
+    Checkpoint for a search. With resume, an unfinished checkpoint is returned as-is;
+    otherwise the search starts over (progress and processed listings are reset).
+    """
+    existing = get_checkpoint(country, search_term)
+    if resume and existing and existing["status"] != "done":
+        return existing
+    conn = get_connection()
+    with conn:
+        if existing:
+            conn.execute("DELETE FROM checkpoint_listings WHERE checkpoint_id = ?", (existing["id"],))
+            conn.execute("""UPDATE scrape_checkpoints SET filtered_url = NULL, pages_loaded = 0, status = 'started', updated_at = ?
+                            WHERE id = ?""", (datetime.now().isoformat(), existing["id"]))
+        else:
+            conn.execute("INSERT INTO scrape_checkpoints (country, search_term, updated_at) VALUES (?, ?, ?)",
+                         (country, search_term, datetime.now().isoformat()))
+    return get_checkpoint(country, search_term)
+
+@traced("db.update_checkpoint")
+def update_checkpoint(checkpoint_id, **fields):
+    """Update filtered_url / pages_loaded / status of a checkpoint."""
+    allowed = {k: v for k, v in fields.items() if k in ("filtered_url", "pages_loaded", "status")}
+    if not allowed:
+        return
+    allowed["updated_at"] = datetime.now().isoformat()
+    assignments = ", ".join(f"{k} = ?" for k in allowed)
+    conn = get_connection()
+    with conn:
+        conn.execute(f"UPDATE scrape_checkpoints SET {assignments} WHERE id = ?", (*allowed.values(), checkpoint_id))
+
+@traced("db.add_checkpoint_listing")
+def add_checkpoint_listing(checkpoint_id, listing_id):
+    """Mark a listing as processed for this checkpoint (including ones filtered out, which aren't stored)."""
+    if not listing_id:
+        return
+    conn = get_connection()
+    with conn:
+        conn.execute("INSERT OR IGNORE INTO checkpoint_listings (checkpoint_id, listing_id) VALUES (?, ?)",
+                     (checkpoint_id, listing_id))
+
+def get_checkpoint_listings(checkpoint_id):
+    conn = get_connection()
+    rows = conn.execute("SELECT listing_id FROM checkpoint_listings WHERE checkpoint_id = ?", (checkpoint_id,)).fetchall()
+    return {r[0] for r in rows}
+
+def get_crawl_watermark(country_id, job_title_id):
+    """Last successful crawl of a (country, job title): {"last_success_at": datetime, "newest_listing_ids": [...]} or None."""
+    row = get_connection().execute(
+        "SELECT last_success_at, newest_listing_ids FROM crawl_watermarks WHERE country_id = ? AND job_title_id = ?",
+        (country_id, job_title_id)).fetchone()
+    if not row:
+        return None
+    return {"last_success_at": datetime.fromisoformat(row[0]), "newest_listing_ids": json.loads(row[1] or "[]")}
+
+def save_crawl_watermark(country_id, job_title_id, finished_at, newest_listing_ids, keep: int = 200):
+    """Record a successful crawl; this run's newest ids go first, then the previous ones, up to `keep`."""
+    previous = get_crawl_watermark(country_id, job_title_id)
+    ids = list(dict.fromkeys(list(newest_listing_ids) + (previous["newest_listing_ids"] if previous else [])))[:keep]
+    conn = get_connection()
+    with conn:
+        conn.execute("""
+        INSERT INTO crawl_watermarks (country_id, job_title_id, last_success_at, newest_listing_ids)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(country_id, job_title_id) DO UPDATE SET
+            last_success_at = excluded.last_success_at,
+            newest_listing_ids = excluded.newest_listing_ids
+        """, (country_id, job_title_id, finished_at.isoformat(), json.dumps(ids)))
+
+def get_export_state(target):
+    """Where the last export to `target` stopped: (last_date_scraped, last_job_id), or None."""
+    row = get_connection().execute(
+        "SELECT last_date_scraped, last_job_id FROM export_state WHERE target = ?", (target,)).fetchone()
+    return (row[0], row[1]) if row else None
+
+def save_export_state(target, last_date_scraped, last_job_id, rows_exported, incremental=True):
+    """Record an export to `target`; an incremental one adds to the running row count."""
+    total = "export_state.rows_exported + excluded.rows_exported" if incremental else "excluded.rows_exported"
+    conn = get_connection()
+    with conn:
+        conn.execute(f"""
+        INSERT INTO export_state (target, last_date_scraped, last_job_id, rows_exported, exported_at)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(target) DO UPDATE SET
+            last_date_scraped = excluded.last_date_scraped,
+            last_job_id = excluded.last_job_id,
+            rows_exported = {total},
+            exported_at = excluded.exported_at
+        """, (target, last_date_scraped, last_job_id, rows_exported, datetime.now().isoformat()))
+
+def add_review(kind, message, job=None):
+    """Queue a notification for later review (unattended runs use this instead of a dialog)."""
+    job = job or {}
+    conn = get_connection()
+    with conn:
+        conn.execute("""
+        INSERT INTO review_queue (kind, message, listing_id, title, company, created_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """, (kind, message, job.get("listing_id"), job.get("title"), job.get("company"), datetime.now().isoformat()))
+
+def get_pending_reviews():
+    cur = get_connection().cursor()
+    cur.execute("""
+    SELECT id, kind, message, listing_id, title, company, created_at
+    FROM review_queue WHERE reviewed_at IS NULL ORDER BY id
+    """)
+    return cur.fetchall()
+
+def mark_reviewed(review_ids):
+    conn = get_connection()
+    with conn:
+        conn.executemany("UPDATE review_queue SET reviewed_at = ? WHERE id = ?",
+                         [(datetime.now().isoformat(), review_id) for review_id in review_ids])
+
+_SEARCH_COLUMNS = ("id", "listing_id", "title", "company", "location", "description", "date_scraped", "score")
+
+def _fts_query(keywords):
+    """OR of the keywords, each quoted so it matches as a literal term or phrase."""
+    return " OR ".join('"{}"'.format(k.replace('"', '""')) for k in keywords if k.strip())
+
+@traced("db.search_jobs")
+def search_jobs(query, limit: int = 20, country=None, job_title=None):
+    """
+    Ranked full-text search over every stored job, best match first (bm25, with title
+    hits weighted above company and description hits).
+    query: an FTS5 expression (e.g. 'python AND "visa sponsorship"', 'devops NOT junior')
+           or a list of keywords/phrases, any of which may match.
+    country / job_title: optional filters on the search the job was scraped under.
+    Returns dicts with the decoded description and the bm25 score (lower is better).
+    """
+    if not isinstance(query, str):
+        query = _fts_query(query)
+    if not query:
+        return []
+    sql = """
+    SELECT j.id, j.listing_id, j.title, j.company, j.location, j.description, j.date_scraped,
+           bm25(jobs_fts, 10.0, 2.0, 1.0) AS score
+    FROM jobs_fts
+    JOIN jobs j ON j.id = jobs_fts.rowid
+    LEFT JOIN countries c ON c.id = j.country_id
+    LEFT JOIN job_titles t ON t.id = j.job_title_id
+    WHERE jobs_fts MATCH ?
+    """
+    params = [query]
+    if country:
+        sql += " AND c.name = ?"
+        params.append(country)
+    if job_title:
+        sql += " AND t.title = ?"
+        params.append(job_title)
+    sql += " ORDER BY score LIMIT ?"
+    params.append(limit)
+    rows = get_connection().execute(sql, params).fetchall()
+    results = [dict(zip(_SEARCH_COLUMNS, r)) for r in rows]
+    for job in results:
+        job["description"] = decode_description(job["description"])
+    return results
+
+def save_run(started_at, finished_at, status, jobs_saved, stages, counters):
+    """Persist a traced run: one runs row plus one run_stages row per stage. Returns the run id."""
+    conn = get_connection()
+    with conn:
+        cur = conn.execute("""
+        INSERT INTO runs (started_at, finished_at, elapsed_s, status, jobs_saved, counters)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """, (started_at.isoformat(), finished_at.isoformat(), (finished_at - started_at).total_seconds(),
+              status, jobs_saved, json.dumps(counters)))
+        run_id = cur.lastrowid
+        conn.executemany("""
+        INSERT INTO run_stages (run_id, stage, count, total_s, mean_s, p50_s, p95_s, max_s)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(run_id, name, st["count"], st["total"], st["mean"], st["p50"], st["p95"], st["max"])
+              for name, st in stages.items()])
+    return run_id
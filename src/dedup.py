@@ -0,0 +1,109 @@
+# src/dedup.py
+"""
+Near-duplicate detection for job postings: MinHash signatures with LSH banding.
+
+A posting is reduced to the set of word k-shingles of its title, company and description;
+the MinHash signature estimates the Jaccard similarity of two such sets as the fraction
+of equal positions. The signature is cut into bands, and each band hashed to a bucket:
+two postings land in a common bucket with high probability when their similarity is
+above roughly (1/BANDS) ** (1/ROWS), so candidates come from a bucket lookup instead of
+comparing against every stored job, and are then confirmed against the threshold.
+"""
+
+import hashlib
+import random
+import re
+import zlib
+from array import array
+
+NUM_PERM = 128
+BANDS = 16  # 16 bands x 8 rows: candidate threshold ~0.71
+SHINGLE_SIZE = 5
+
+_PRIME = (1 << 61) - 1
+_MASK = (1 << 32) - 1
+# fixed seed: signatures are stored, so the permutations must not change between runs
+_rng = random.Random(20240601)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+def dedup_text(job) -> str:
+    return f"{job.get('title') or ''}\n{job.get('company') or ''}\n{job.get('description') or ''}"
+
+def job_signature(job):
+    """Signature of a job dict, computed once and kept on the dict under "signature"."""
+    if "signature" not in job:
+        job["signature"] = signature(dedup_text(job))
+    return job["signature"]
+
+def shingles(text: str, size: int = SHINGLE_SIZE):
+    """Word `size`-grams of the lowercased text (the whole text if it is shorter)."""
+    words = re.findall(r"\w+", (text or "").lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def signature(text: str):
+    """MinHash signature (array of NUM_PERM 32-bit ints), or None for text without words."""
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles(text)]
+    if not hashes:
+        return None
+    return array("I", [min([(a * h + b) % _PRIME for h in hashes]) & _MASK for a, b in _PERMUTATIONS])
+
+def band_buckets(sig):
+    """One bucket key per band: (band number, signed 64-bit hash of the band's rows)."""
+    rows = len(sig) // BANDS
+    return [(band, int.from_bytes(hashlib.blake2b(sig[band * rows:(band + 1) * rows].tobytes(), digest_size=8).digest(),
+                                  "little", signed=True))
+            for band in range(BANDS)]
+
+def similarity(sig_a, sig_b) -> float:
+    """Estimated Jaccard similarity of the two shingle sets."""
+    if len(sig_a) != len(sig_b):
+        return 0.0
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+class LshIndex:
+    """In-memory LSH buckets for signatures that aren't in the database (yet)."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._signatures = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def add(self, key, sig):
+        if sig is None or key in self._signatures:
+            return
+        self._signatures[key] = sig
+        for bucket in band_buckets(sig):
+            self._buckets.setdefault(bucket, set()).add(key)
+
+    def remove(self, key):
+        sig = self._signatures.pop(key, None)
+        if sig is None:
+            return
+        for bucket in band_buckets(sig):
+            keys = self._buckets.get(bucket)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._buckets[bucket]
+
+    def best(self, sig, threshold: float, exclude=None):
+        """(key, similarity) of the most similar signature at or above threshold, or None."""
+        candidates = set()
+        for bucket in band_buckets(sig):
+            candidates |= self._buckets.get(bucket, set())
+        candidates.discard(exclude)
+        scored = [(key, similarity(sig, self._signatures[key])) for key in candidates]
+        scored = [item for item in scored if item[1] >= threshold]
+        return max(scored, key=lambda item: item[1]) if scored else None
+
+def to_blob(sig) -> bytes:
+    return sig.tobytes()
+
+def from_blob(blob: bytes):
+    sig = array("I")
+    sig.frombytes(blob)
+    return sig
@@ -0,0 +1,120 @@
+# src/export.py
+"""
+Export the jobs table (joined with countries and job_titles) for analysis, streaming it
+in fixed-size chunks so memory stays flat however big the database gets.
+
+    python -m src.export --format parquet --out data/export/jobs       # dataset dir, by country/scrape_date
+    python -m src.export --format csv --out data/export/jobs.csv
+    python -m src.export --format parquet --out data/export/jobs --incremental   # only rows newer than the last export
+
+Parquet needs pyarrow (pinned in requirements.txt); CSV only needs pandas. The position of the
+last export is kept per output path in the export_state table.
+"""
+
+import argparse
+import shutil
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+from .database import init_db, close_connection, get_connection, decode_description, get_export_state, save_export_state
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# (date_scraped, id) orders rows by when they were written (upserts refresh date_scraped)
+# and makes an exact resume point for incremental exports
+_EXPORT_SQL = """
+SELECT j.id, j.listing_id, c.name AS country, t.title AS search_term, j.title, j.company,
+       j.location, j.description, j.date_scraped,
+       (SELECT COUNT(*) FROM job_keyword_matches m WHERE m.job_id = j.id) AS keyword_matches
+FROM jobs j
+LEFT JOIN countries c ON c.id = j.country_id
+LEFT JOIN job_titles t ON t.id = j.job_title_id
+{where}
+ORDER BY j.date_scraped, j.id
+"""
+
+def iter_job_chunks(after=None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """DataFrames of at most chunk_size jobs, oldest first; after=(date_scraped, id) skips up to that row."""
+    where, params = "", ()
+    if after:
+        where, params = "WHERE (j.date_scraped, j.id) > (?, ?)", tuple(after)
+    for chunk in pd.read_sql_query(_EXPORT_SQL.format(where=where), get_connection(), params=params, chunksize=chunk_size):
+        if chunk.empty:  # an empty result still comes back as one empty frame
+            continue
+        chunk["description"] = chunk["description"].map(decode_description)
+        yield chunk
+
+def _parquet_writer(out: Path):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Parquet export needs pyarrow (pip install -r requirements.txt); use --format csv otherwise")
+    token = uuid.uuid4().hex[:8]
+
+    def write(chunk, n):
+        chunk = chunk.assign(country=chunk["country"].fillna("unknown"),
+                             scrape_date=chunk["date_scraped"].str[:10].fillna("unknown"))
+        # new files per chunk: incremental exports add to the dataset, never rewrite it
+        pq.write_to_dataset(pa.Table.from_pandas(chunk, preserve_index=False), root_path=str(out),
+                            partition_cols=["country", "scrape_date"],
+                            basename_template=f"part-{token}-{n:05d}-{{i}}.parquet",
+                            existing_data_behavior="overwrite_or_ignore")
+    return write
+
+def _csv_writer(out: Path, append: bool):
+    out.parent.mkdir(parents=True, exist_ok=True)
+    header = not (append and out.exists() and out.stat().st_size > 0)
+
+    def write(chunk, n):
+        nonlocal header
+        chunk.to_csv(out, mode="a" if (append or n) else "w", header=header, index=False)
+        header = False
+    return write
+
+def export_jobs(out, fmt: str = "parquet", incremental: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                overwrite: bool = False) -> int:
+    """Write jobs to `out` chunk by chunk; returns the number of rows exported."""
+    out = Path(out)
+    target = f"{fmt}:{out.resolve()}"
+    after = get_export_state(target) if incremental else None
+    if fmt == "parquet":
+        if not incremental and out.exists() and any(out.iterdir()):
+            if not overwrite:
+                raise SystemExit(f"{out} is not empty; use --incremental to add to it or --overwrite to replace it")
+            shutil.rmtree(out)
+        write = _parquet_writer(out)
+    else:
+        write = _csv_writer(out, append=incremental)
+
+    rows, last = 0, after
+    for n, chunk in enumerate(iter_job_chunks(after, chunk_size)):
+        write(chunk, n)
+        rows += len(chunk)
+        last = (chunk["date_scraped"].iloc[-1], int(chunk["id"].iloc[-1]))
+        print(f"Exported {rows} rows...")
+    if last and (rows or not incremental):
+        save_export_state(target, last[0], last[1], rows, incremental=incremental)
+    print(f"Exported {rows} {'new ' if incremental else ''}jobs to {out}")
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export scraped jobs to Parquet or CSV")
+    parser.add_argument("--format", choices=("parquet", "csv"), default="parquet")
+    parser.add_argument("--out", help="dataset directory (parquet) or file (csv); defaults under data/export")
+    parser.add_argument("--incremental", action="store_true", help="only rows written since the last export to --out")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--overwrite", action="store_true", help="replace an existing parquet dataset")
+    args = parser.parse_args(argv)
+
+    out = args.out or Path(__file__).resolve().parent.parent / "data" / "export" / ("jobs.csv" if args.format == "csv" else "jobs")
+    init_db()
+    try:
+        export_jobs(out, args.format, args.incremental, args.chunk_size, args.overwrite)
+    finally:
+        close_connection()
+
+if __name__ == "__main__":
+    main()
@@ -1,81 +1,404 @@
 # src/glassdoor.py  (MODIFIED)
 import asyncio
+import json
+import math
+import os
 import time
+from datetime import datetime
 from playwright.async_api import async_playwright, Error as PlaywrightError
-from .config import COUNTRY as CFG_COUNTRY, SEARCH_TERM as CFG_SEARCH_TERM, USE_PERSISTENT_BROWSER, BROWSER_PROFILE_PATH, BROWSER, DEBUG, WAIT_TIME, FROM_AGE
-from .database import get_or_create, insert_job, get_search_params, get_keywords_for_title
-from .pages.glassdoor_page import GlassdoorPage
+from .config import COUNTRY as CFG_COUNTRY, SEARCH_TERM as CFG_SEARCH_TERM, USE_PERSISTENT_BROWSER, BROWSER_PROFILE_PATH, BROWSER, DEBUG, WAIT_TIME, WAIT_TIMEOUT, FROM_AGE, DELTA_CRAWL, WATERMARK_IDS, DESCRIPTION_WORKERS, JOB_QUEUE_SIZE, SEARCH_CONCURRENCY, NETWORK_PROFILE, NETWORK_BLOCK_TYPES, NETWORK_BLOCK_DOMAINS, CAPTURE_RESPONSES, INCREMENTAL_HARVEST, PRUNE_CARDS, MODAL_GUARD, TRACE_JSON, STORE_MATCHED_JOBS, SKIP_DUPLICATES, HEADLESS, UNATTENDED, STORAGE_STATE_PATH, BROWSER_SERVICE_URL
+from .database import (JobWriter, get_or_create, get_all_search_params, get_keyword_rules, get_seen_listing_ids,
+    start_checkpoint, update_checkpoint, add_checkpoint_listing, get_checkpoint_listings, get_unfinished_checkpoints, save_run, add_review,
+    get_crawl_watermark, save_crawl_watermark)
+from .keywords import KeywordMatcher
+from .pages.glassdoor_page import GlassdoorPage, HarvestOptions
+from .pages.glassdoor_api import JobResponseCapture
+from .pages.description_pool import DescriptionPool
 from .utils import controls, ui
-from .utils.window import maximize_and_set_viewport
+from .utils.network import NetworkPolicy
+from .utils.har import HarArchive
+from .utils.tracing import tracer
 
-async def search_glassdoor():
-    controls.start_listeners()
-
-    db_params = get_search_params()
-    COUNTRY = db_params[0] if db_params else CFG_COUNTRY
-    SEARCH_TERM = db_params[1] if db_params else CFG_SEARCH_TERM
+async def _store_jobs(queue: asyncio.Queue, writer: JobWriter, progress: dict = None):
+    """Writer task: persist jobs taken from the queue until it receives None."""
+    while True:
+        job = await queue.get()
+        if job is None:
+            break
+        writer.add(job)
+        tracer.count("jobs.saved")
+        if progress is not None:
+            progress["saved"] = progress.get("saved", 0) + 1
+        print(f"Saved: {job['title']} - {job['company']}")
 
+async def stream_jobs_to_db(jobs, country_id, job_title_id, progress: dict = None, writer: JobWriter = None) -> JobWriter:
+    """
+    Consume an async iterable of jobs and persist them through a bounded queue and a
+    separate writer task, so scraping and DB writes overlap and nothing already scraped
+    is lost on abort (the writer is also flushed by the kill/restart hotkeys).
+    """
+    queue = asyncio.Queue(maxsize=JOB_QUEUE_SIZE)
+    writer = writer or JobWriter(country_id, job_title_id)
+    controls.register_exit_hook(writer.flush)
+    writer_task = asyncio.create_task(_store_jobs(queue, writer, progress))
     try:
-        country_id = get_or_create("countries", "name", COUNTRY)
-        job_title_id = get_or_create("job_titles", "title", SEARCH_TERM)
+        async for job in jobs:
+            if writer_task.done():
+                break
+            await queue.put(job)
+    finally:
+        if not writer_task.done():
+            await queue.put(None)
+        try:
+            await writer_task
+        finally:
+            writer.close()
+            controls.unregister_exit_hook(writer.flush)
+    print(f"DB: wrote {writer.rows_written} jobs ({writer.rows_per_sec:.0f} rows/sec)")
+    return writer
 
-        async with async_playwright() as p:
-            args = ["--disable-blink-features=AutomationControlled", "--disable-infobars"]
+class SearchSession:
+    """
+    The browser shared by every search of a run. Each search gets its own context (or,
+    for a persistent profile, its own page in the single persistent context). The first
+    search to get through login publishes its storage state so later contexts start
+    already authenticated. A saved STORAGE_STATE_PATH seeds that state, so unattended runs
+    never need the manual login prompt. With a browser service the context is the
+    service's, and its keep-alive tab is left alone (reuse_initial_page=False).
+    With a HAR archive every context is recorded, or (replay) served from the archive;
+    a replay is headless and unattended.
+    """
 
-            if USE_PERSISTENT_BROWSER and BROWSER_PROFILE_PATH:
-                browser_context = await p.chromium.launch_persistent_context(
-                    user_data_dir=BROWSER_PROFILE_PATH,
-                    channel=BROWSER.lower(),
-                    headless=False,
-                    args=args
-                )
-                page = browser_context.pages[0] if browser_context.pages else await browser_context.new_page()
+    def __init__(self, browser, persistent: bool, network: NetworkPolicy = None, reuse_initial_page: bool = True,
+                 archive: HarArchive = None):
+        self.browser = browser
+        self.persistent = persistent
+        self.network = network
+        self.archive = archive
+        replaying = bool(archive and archive.replaying)
+        self.headless = HEADLESS or replaying
+        self.unattended = UNATTENDED or replaying
+        self.storage_state = None
+        if STORAGE_STATE_PATH and os.path.exists(STORAGE_STATE_PATH) and not replaying:
+            self.storage_state = STORAGE_STATE_PATH
+        self.login_lock = asyncio.Lock()
+        self._login_shared = False  # a search of this run is logged in; its session is shared
+        self._initial_page_used = not reuse_initial_page
+
+    async def open(self, name: str = "session"):
+        """Return (context, page) for a new search; `name` names its HAR when recording."""
+        if self.persistent:
+            context = self.browser
+            if context.pages and not self._initial_page_used:
+                # reuse the tab the persistent context opens with
+                self._initial_page_used = True
+                page = context.pages[0]
             else:
-                browser_context = await p.chromium.launch(headless=False, channel=BROWSER.lower(), args=args)
-                page = await browser_context.new_page()
+                page = await context.new_page()
+        else:
+            context = await self.browser.new_context(storage_state=self.storage_state)
+            page = await context.new_page()
+        if self.network:
+            await self.network.install(context)
+        if self.archive:
+            await self.archive.install(context, "session" if self.persistent else name)
+        return context, page
+
+    async def close(self, context, page):
+        if self.persistent:
+            await page.close()
+        else:
+            await context.close()
+
+    async def _adopt_shared_login(self, gd: GlassdoorPage) -> bool:
+        """
+        Log in a context opened before another search logged in: copy that session's cookies
+        into it (a persistent context already shares them) and reload.
+        """
+        if not self.persistent and self.storage_state:
+            state = self.storage_state
+            if isinstance(state, str):
+                with open(state, encoding="utf-8") as f:
+                    state = json.load(f)
+            await gd.page.context.add_cookies(state.get("cookies", []))
+        await gd.page.reload()
+        return await gd.is_logged_in()
 
+    async def ensure_logged_in(self, gd: GlassdoorPage):
+        # one login prompt at a time; whoever logs in first shares the session with the
+        # contexts opened alongside it, which then don't prompt again
+        async with self.login_lock:
+            logged_in = await gd.is_logged_in()
+            if not logged_in and self._login_shared:
+                logged_in = await self._adopt_shared_login(gd)
+                if logged_in:
+                    print("Logged in with the session of another search")
+            if not logged_in:
+                if self.archive and self.archive.replaying:
+                    raise RuntimeError("Not logged in to Glassdoor in the recorded session; record a logged-in run")
+                if self.unattended:
+                    raise RuntimeError("Not logged in to Glassdoor and nobody to log in (unattended run); "
+                                       "refresh STORAGE_STATE_PATH with an interactive run")
+                await asyncio.to_thread(ui.prompt_user, "RPA Login", "Login required on Glassdoor. Please log in manually and click OK.")
+                # the prompt can't block without a console (it only prints then), so check
+                # before saving or sharing what could be a logged-out session
+                if not await gd.is_logged_in():
+                    raise RuntimeError("Still not logged in to Glassdoor after the login prompt")
+                if STORAGE_STATE_PATH:
+                    await gd.page.context.storage_state(path=STORAGE_STATE_PATH)
+                    print(f"Login saved to {STORAGE_STATE_PATH}")
+            if not self.persistent and (self.storage_state is None or not logged_in):
+                self.storage_state = await gd.page.context.storage_state()
+            self._login_shared = True
+
+# fromAge values the site's "date posted" filter offers
+FROM_AGE_STEPS = (1, 3, 7, 14, 30)
+
+def crawl_from_age(watermark, now=None) -> int:
+    """
+    fromAge (days) for a crawl: the smallest step covering the time since the last
+    successful crawl, capped at FROM_AGE. Within a day of it that is fromAge=1; past a
+    day, a day of slack is added (postings are dated by day).
+    """
+    if not watermark:
+        return FROM_AGE
+    now = now or datetime.now()
+    age = (now - watermark["last_success_at"]).total_seconds() / 86400
+    days = 1 if age <= 1 else math.ceil(age) + 1
+    step = next((s for s in FROM_AGE_STEPS if s >= days), FROM_AGE)
+    return min(step, FROM_AGE)
+
+async def run_search(session: SearchSession, country: str, search_term: str, progress: dict, resume: bool = False):
+    """
+    Scrape one (country, search_term) pair in its own context and store the new jobs.
+    Progress is checkpointed to SQLite; with resume, an unfinished checkpoint is continued:
+    the search step is skipped (straight to the saved filtered URL) and listings already
+    processed are not opened again.
+    """
+    label = f"[{country} / {search_term}]"
+    country_id = get_or_create("countries", "name", country)
+    job_title_id = get_or_create("job_titles", "title", search_term)
+    checkpoint = start_checkpoint(country, search_term, resume=resume)
+    # with a watermark, paging stops at the first page made only of jobs known at that
+    # crawl (not jobs stored since, which an interrupted run may have left half-done)
+    watermark = get_crawl_watermark(country_id, job_title_id) if DELTA_CRAWL else None
+    stop_ids = None
+    if watermark:
+        stop_ids = set(watermark["newest_listing_ids"]) | get_seen_listing_ids(scraped_before=watermark["last_success_at"])
+    # a replay requests the URLs of the recording, so it computes fromAge as of that time
+    from_age = crawl_from_age(watermark, now=session.archive.started_at if session.archive else None)
+    if watermark:
+        print(f"{label} Last crawl {watermark['last_success_at']:%Y-%m-%d %H:%M}: fromAge={from_age}")
+    if checkpoint["filtered_url"]:
+        print(f"{label} Resuming checkpoint from {checkpoint['updated_at']} "
+              f"({checkpoint['pages_loaded']} pages loaded, status {checkpoint['status']})")
+
+    context, page = await session.open(f"{country}-{search_term}")
+    try:
+        if not session.headless:
             # maximize and set viewport to actual window bounds
+            from .utils.window import maximize_and_set_viewport
             await maximize_and_set_viewport(page, title_hint="Glassdoor")
+        capture = JobResponseCapture().attach(page) if CAPTURE_RESPONSES else None
 
-            print("Navigating directly to Glassdoor jobs page...")
-            await page.goto("https://www.glassdoor.co.uk/Job/index.htm")
-            gd = GlassdoorPage(page, wait_time=WAIT_TIME)
+        gd = GlassdoorPage(page, wait_time=WAIT_TIME, wait_timeout=WAIT_TIMEOUT)
+        if MODAL_GUARD:
+            await gd.install_modal_guard()
 
-            if not await gd.is_logged_in():
-                ui.show_msgbox("RPA Login", "Login required on Glassdoor. Please log in manually and click OK.")
+        progress["status"] = "navigating"
+        print(f"{label} Navigating directly to Glassdoor jobs page...")
+        await page.goto("https://www.glassdoor.co.uk/Job/index.htm")
 
-            await gd.wait(WAIT_TIME)
-            await gd.search_job(SEARCH_TERM, COUNTRY)
+        await session.ensure_logged_in(gd)
+
+        full_url = checkpoint["filtered_url"]
+        if not full_url:
+            await gd.wait_for_ready(gd.SEARCH_TITLE_INPUT)
+            await gd.search_job(search_term, country)
             await gd.close_modal_if_exists()
 
             current_url = page.url
             if "?" in current_url:
-                full_url = f"{current_url}&sortBy=date_desc&fromAge={FROM_AGE}"
+                full_url = f"{current_url}&sortBy=date_desc&fromAge={from_age}"
             else:
-                full_url = f"{current_url}?sortBy=date_desc&fromAge={FROM_AGE}"
+                full_url = f"{current_url}?sortBy=date_desc&fromAge={from_age}"
+            update_checkpoint(checkpoint["id"], filtered_url=full_url, status="searched")
 
-            print(f"Navigating to filtered URL: {full_url}")
-            await page.goto(full_url)
-            await gd.wait(WAIT_TIME)
+        print(f"{label} Navigating to filtered URL: {full_url}")
+        await page.goto(full_url)
+        await gd.wait_for_ready(gd.JOB_CARD_SELECTOR)
 
-            await gd.load_all_jobs()
+        # cards are only reachable through load-more, so a resumed run replays the paging
+        # (event-driven, no descriptions) and only records pages beyond the checkpoint
+        reached = checkpoint["pages_loaded"]
+        def on_page(n):
+            if n > reached:
+                update_checkpoint(checkpoint["id"], pages_loaded=n)
 
-            # ensure modal closed after load
-            await gd.close_modal_if_exists()
+        if not INCREMENTAL_HARVEST:
+            progress["status"] = "loading"
+            await gd.load_all_jobs(on_page=on_page, stop_ids=stop_ids)
+            update_checkpoint(checkpoint["id"], status="loaded")
+
+        # ensure modal closed after load
+        await gd.close_modal_if_exists()
+
+        # get keywords for the job_title_id and pass to get_jobs
+        keywords = KeywordMatcher(get_keyword_rules(job_title_id))
+        print(f"{label} Total keywords scraped: {[k for k, _ in keywords.rules]}")
+
+        known_ids = get_seen_listing_ids() | get_checkpoint_listings(checkpoint["id"])
+        print(f"{label} Known listings in DB: {len(known_ids)}")
+
+        progress["status"] = "scraping"
+        pool = None
+        if DESCRIPTION_WORKERS > 1:
+            pool = DescriptionPool(context, DESCRIPTION_WORKERS, wait_time=WAIT_TIME, wait_timeout=WAIT_TIMEOUT, retry=gd.retry,
+                                   modal_guard=MODAL_GUARD)
+        # created here so the scrape-time duplicate check also sees the jobs it hasn't written yet
+        writer = JobWriter(country_id, job_title_id)
+        try:
+            if capture:
+                print(f"{label} Captured {len(capture.jobs)} jobs from {capture.responses_parsed} JSON responses")
+            options = HarvestOptions(known_ids=known_ids, stop_ids=stop_ids,
+                                     on_ignored=lambda listing_id: add_checkpoint_listing(checkpoint["id"], listing_id),
+                                     on_page=on_page, notify=add_review if session.unattended else None,
+                                     duplicates=writer.check_duplicate if SKIP_DUPLICATES else None)
+            jobs = gd.get_jobs(keywords=keywords, pool=pool, capture=capture, incremental=INCREMENTAL_HARVEST,
+                               prune=PRUNE_CARDS, keep_matched=STORE_MATCHED_JOBS, options=options)
+            await stream_jobs_to_db(jobs, country_id, job_title_id, progress=progress, writer=writer)
+        finally:
+            if pool:
+                await pool.close()
+        print(f"{label} Total jobs scraped: {writer.rows_written}")
+        update_checkpoint(checkpoint["id"], status="done")
+        # finished, so everything stored up to now was fully processed
+        save_crawl_watermark(country_id, job_title_id, datetime.now(), gd.harvested_ids, keep=WATERMARK_IDS)
+        if MODAL_GUARD:
+            dismissed = await gd.modal_dismissals()
+            tracer.count("modal.dismissed", dismissed)
+            print(f"{label} Modals dismissed in-page: {dismissed}")
+
+        if DEBUG:
+            for name, stat in sorted(gd.wait_stats.items()):
+                print(f"{label} WAIT {name}: {stat['count']}x, total {stat['total']:.1f}s, max {stat['max']:.1f}s, timeouts {stat['timeouts']}")
+            for key, stat in sorted(gd.retry.stats.items(), key=lambda kv: kv[1]["total"], reverse=True):
+                print(f"{label} RETRY {key}: {stat['operations']} ops, {stat['attempts']} attempts, {stat['failures']} failed, "
+                      f"{stat['short_circuits']} short-circuited, total {stat['total']:.1f}s, max {stat['max']:.1f}s")
+    finally:
+        try:
+            await session.close(context, page)
+        except PlaywrightError:
+            pass
+
+async def _run_isolated(session, semaphore, country, search_term, progress, resume=False):
+    """Run one search under the concurrency limit; a failure is recorded, not propagated."""
+    async with semaphore:
+        progress.update(status="running", started=time.monotonic())
+        try:
+            await run_search(session, country, search_term, progress, resume=resume)
+            progress["status"] = "done"
+        except Exception as e:
+            import traceback
+            progress.update(status="failed", error=str(e))
+            print(f"[{country} / {search_term}] Search failed:", e)
+            traceback.print_exc()
+        finally:
+            progress["elapsed"] = time.monotonic() - progress["started"]
+
+def _save_trace(started_at, progress):
+    """Persist the tracer's stage timings and counters for this run, optionally as JSON too."""
+    finished_at = datetime.now()
+    states = [state["status"] for state in progress.values()]
+    status = "done" if all(s == "done" for s in states) else "failed" if "failed" in states else "partial"
+    jobs_saved = sum(state["saved"] for state in progress.values())
+    stages, counters = tracer.summary(), dict(tracer.counters)
+    run_id = save_run(started_at, finished_at, status, jobs_saved, stages, counters)
+
+    print(f"Run {run_id}: slowest stages by total time")
+    for name, st in sorted(stages.items(), key=lambda kv: kv[1]["total"], reverse=True)[:10]:
+        print(f"  {name}: {st['count']}x total={st['total']:.2f}s p50={st['p50']:.3f}s p95={st['p95']:.3f}s")
+    if TRACE_JSON:
+        with open(TRACE_JSON, "w", encoding="utf-8") as f:
+            json.dump({
+                "run_id": run_id,
+                "started_at": started_at.isoformat(),
+                "finished_at": finished_at.isoformat(),
+                "status": status,
+                "jobs_saved": jobs_saved,
+                "stages": stages,
+                "counters": counters,
+            }, f, indent=2)
+        print(f"Trace written to {TRACE_JSON}")
+
+async def _connect_service(p):
+    """Attach to a running browser service (see browser_service.py), or None to launch instead."""
+    try:
+        browser = await p.chromium.connect_over_cdp(BROWSER_SERVICE_URL, timeout=5000)
+    except PlaywrightError as e:
+        print(f"Browser service not reachable at {BROWSER_SERVICE_URL}; launching a browser instead ({e})")
+        return None
+    if not browser.contexts:
+        await browser.close()
+        return None
+    print(f"Connected to browser service at {BROWSER_SERVICE_URL}")
+    return browser
+
+async def search_glassdoor(resume: bool = False, archive: HarArchive = None):
+    """Run every configured search; with a HarArchive the run is recorded or replayed (see utils/har.py)."""
+    replaying = bool(archive and archive.replaying)
+    controls.start_listeners(enabled=not (UNATTENDED or replaying))
+    started_at = datetime.now()
+    tracer.reset()
+
+    searches = list(dict.fromkeys(get_all_search_params())) or [(CFG_COUNTRY, CFG_SEARCH_TERM)]
+    unfinished = get_unfinished_checkpoints()
+    if unfinished and not resume:
+        print(f"{len(unfinished)} unfinished checkpoint(s) found; starting over (run with --resume to continue them)")
+    progress = {s: {"status": "queued", "saved": 0} for s in searches}
+
+    try:
+        async with async_playwright() as p:
+            args = ["--disable-blink-features=AutomationControlled", "--disable-infobars"]
+
+            # recorded and replayed runs own their browser: the HARs are written when it closes
+            service = await _connect_service(p) if BROWSER_SERVICE_URL and not archive else None
+            persistent = bool(service or (USE_PERSISTENT_BROWSER and BROWSER_PROFILE_PATH and not replaying))
+            if service:
+                # the service's logged-in default context; its pages are ours to open and close
+                browser = service.contexts[0]
+            elif persistent:
+                browser = await p.chromium.launch_persistent_context(
+                    user_data_dir=BROWSER_PROFILE_PATH,
+                    channel=BROWSER.lower(),
+                    headless=HEADLESS,
+                    args=args
+                )
+            else:
+                browser = await p.chromium.launch(headless=HEADLESS or replaying, channel=BROWSER.lower(), args=args)
 
-            # get keywords for the job_title_id and pass to get_jobs
-            keywords = get_keywords_for_title(job_title_id)
-            print(f"Total keywords scraped: {keywords}")
-            
-            jobs = await gd.get_jobs(keywords=keywords)
-            print(f"Total jobs scraped: {len(jobs)}")
+            network = NetworkPolicy.from_profile(NETWORK_PROFILE, NETWORK_BLOCK_TYPES, NETWORK_BLOCK_DOMAINS)
+            session = SearchSession(browser, persistent, network, reuse_initial_page=not service, archive=archive)
+            semaphore = asyncio.Semaphore(max(1, SEARCH_CONCURRENCY))
+            print(f"Running {len(searches)} search(es), {SEARCH_CONCURRENCY} at a time")
+            await asyncio.gather(*(
+                _run_isolated(session, semaphore, country, term, progress[(country, term)], resume=resume)
+                for country, term in searches
+            ))
 
-            for job in jobs:
-                insert_job(country_id, job_title_id, job['title'], job['company'], job['location'], job['description'])
-                print(f"Saved: {job['title']} - {job['company']}")
+            for (country, term), state in progress.items():
+                error = f" ({state['error']})" if state.get("error") else ""
+                print(f"[{country} / {term}] {state['status']}: {state['saved']} jobs saved in {state.get('elapsed', 0):.0f}s{error}")
+            if network:
+                print(network.summary())
 
-            if not (USE_PERSISTENT_BROWSER and BROWSER_PROFILE_PATH):
-                await browser_context.close()
+            if service:
+                # disconnects only; the service and its context keep running
+                await service.close()
+            elif not persistent or archive:
+                await browser.close()
+            if archive and archive.recording:
+                print(f"Recorded {len(archive.hars)} HAR file(s) to {archive.path}")
 
     except PlaywrightError as e:
         print("Playwright error:", e)
@@ -83,3 +406,6 @@ async def search_glassdoor():
         import traceback
         print("Unexpected error:", e)
         traceback.print_exc()
+    finally:
+        if tracer.enabled:
+            _save_trace(started_at, progress)
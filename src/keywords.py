@@ -0,0 +1,126 @@
+# src/keywords.py
+import re
+
+MATCH_SUBSTRING = "substring"
+MATCH_WORD = "word"
+MATCH_PHRASE = "phrase"
+MATCH_MODES = (MATCH_SUBSTRING, MATCH_WORD, MATCH_PHRASE)
+
+# Below this many substring keywords, C-level `needle in text` scans beat the trie regex
+# (see benchmarks/keyword_matcher.py); above it the single regex pass wins.
+LITERAL_SCAN_LIMIT = 200
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+def keyword_pattern(keyword: str, mode: str = MATCH_SUBSTRING) -> str:
+    """
+    Regex source for one keyword.
+    substring: anywhere in the text (the original `kw in content` behaviour)
+    word:      not glued to other letters/digits, e.g. "java" won't hit "javascript"
+    phrase:    like word, and the words may be separated by any whitespace/line breaks
+    """
+    if mode not in MATCH_MODES:
+        raise ValueError(f"Unknown keyword match mode: {mode}")
+    if mode == MATCH_PHRASE:
+        body = r"\s+".join(re.escape(w) for w in keyword.split())
+    else:
+        body = re.escape(keyword)
+    if mode == MATCH_SUBSTRING:
+        return body
+    return rf"(?<!\w){body}(?!\w)"
+
+def _trie_regex(keywords, phrase=False) -> str:
+    """
+    Factor keywords into a prefix trie and render it as one regex, e.g. java, javascript,
+    jira -> j(?:ava(?:script)?|ira). The regex engine then walks the trie once per text
+    position instead of retrying every alternative (what a flat a|b|c... alternation does).
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def render(node):
+        end = "" in node
+        branches = []
+        for ch in sorted(k for k in node if k):
+            token = r"\s+" if phrase and ch == " " else re.escape(ch)
+            branches.append(token + render(node[ch]))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if end:
+            body = body + "?" if len(branches) == 1 and len(branches[0]) == 1 else "(?:" + body + ")?"
+        return body
+
+    return render(trie)
+
+class KeywordMatcher:
+    """
+    All keywords of a job title compiled once per run. Texts are lowercased once; plain
+    substring keywords are checked with pre-lowered literal scans (or folded into the
+    regex when there are many), word/phrase keywords go through one trie-shaped regex.
+    rules: iterable of keyword strings or (keyword, mode) pairs.
+    """
+
+    def __init__(self, rules=()):
+        self.rules = []
+        for rule in rules:
+            keyword, mode = (rule, MATCH_SUBSTRING) if isinstance(rule, str) else rule
+            if keyword and keyword.strip():
+                self.rules.append((keyword, mode or MATCH_SUBSTRING))
+        # longest first so the alternation prefers the most specific keyword
+        ordered = sorted(self.rules, key=lambda r: len(r[0]), reverse=True)
+        self._patterns = {r: re.compile(keyword_pattern(r[0].lower(), r[1])) for r in ordered}
+        substrings = [k.lower() for k, mode in ordered if mode == MATCH_SUBSTRING]
+        self._literals = substrings if len(substrings) < LITERAL_SCAN_LIMIT else []
+        self._combined = self._compile_combined([r for r in ordered if not (self._literals and r[1] == MATCH_SUBSTRING)])
+        self._by_text = {_normalize(k): k for k, _ in ordered}
+
+    @staticmethod
+    def _compile_combined(rules):
+        substring = [k.lower() for k, mode in rules if mode == MATCH_SUBSTRING]
+        word = [k.lower() for k, mode in rules if mode == MATCH_WORD]
+        phrase = [_normalize(k) for k, mode in rules if mode == MATCH_PHRASE]
+        parts = []
+        if substring:
+            parts.append(_trie_regex(substring))
+        if word:
+            parts.append(rf"(?<!\w)(?:{_trie_regex(word)})(?!\w)")
+        if phrase:
+            parts.append(rf"(?<!\w)(?:{_trie_regex(phrase, phrase=True)})(?!\w)")
+        # keywords are lowercased here and texts in search(), which is much cheaper than re.IGNORECASE
+        return re.compile("|".join(parts)) if parts else None
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __bool__(self):
+        return bool(self.rules)
+
+    def search(self, text: str):
+        """Return the first keyword found in text, or None."""
+        if not text:
+            return None
+        lowered = text.lower()
+        for needle in self._literals:
+            if needle in lowered:
+                return self._by_text.get(_normalize(needle), needle)
+        match = self._combined.search(lowered) if self._combined else None
+        if not match:
+            return None
+        return self._by_text.get(_normalize(match.group(0)), match.group(0))
+
+    def find_all(self, text: str):
+        """Every keyword present in text (the combined regex is used as a fast reject)."""
+        return [keyword for keyword, _ in self.find_rules(text)]
+
+    def find_rules(self, text: str):
+        """Like find_all, but returns the matching (keyword, mode) rules."""
+        if not self.search(text):
+            return []
+        lowered = text.lower()
+        return [rule for rule, pattern in self._patterns.items() if pattern.search(lowered)]
@@ -1,18 +1,90 @@
+import argparse
 import asyncio
 import sys
-from .database import init_db
+from .database import init_db, close_connection, use_database, backup_database, get_pending_reviews, mark_reviewed, get_unmatched_jobs, get_duplicate_clusters
 from .glassdoor import search_glassdoor
+from .utils import controls
+from .utils.har import HarArchive, RECORD, REPLAY
 
-async def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Glassdoor job search RPA")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue unfinished searches from their last checkpoint instead of starting over")
+    parser.add_argument("--reviews", action="store_true",
+                        help="print the notifications queued by unattended runs, mark them reviewed and exit")
+    parser.add_argument("--unmatched", action="store_true",
+                        help="print the stored jobs none of their keywords match (one per group of duplicates) and exit")
+    parser.add_argument("--duplicates", action="store_true",
+                        help="print the groups of near-duplicate stored jobs and exit")
+    har = parser.add_mutually_exclusive_group()
+    har.add_argument("--record", metavar="DIR",
+                     help="record the run's network traffic and starting database to DIR for --replay")
+    har.add_argument("--replay", metavar="DIR",
+                     help="rerun a recorded session offline from DIR, against a copy of its database")
+    return parser.parse_args(argv)
+
+def show_reviews():
+    reviews = get_pending_reviews()
+    for _, kind, message, listing_id, title, company, created_at in reviews:
+        print(f"{created_at} [{kind}] {title} - {company} ({listing_id}): {message}")
+    mark_reviewed([review[0] for review in reviews])
+    print(f"{len(reviews)} notification(s) reviewed")
+
+def show_unmatched():
+    jobs = get_unmatched_jobs(distinct=True)
+    for job in jobs:
+        print(f"{job['date_scraped']} {job['title']} - {job['company']} ({job['location']}) {job['listing_id'] or ''}")
+    print(f"{len(jobs)} unmatched job(s)")
+
+def show_duplicates():
+    clusters = get_duplicate_clusters()
+    for jobs in clusters:
+        first = jobs[0]
+        print(f"{first['title']} - {first['company']}: {len(jobs)} postings")
+        for job in jobs:
+            print(f"    {job['date_scraped']} {job['location']} {job['listing_id'] or ''}")
+    print(f"{len(clusters)} group(s) of duplicates")
+
+async def main(args):
+    controls.set_restart_target(asyncio.current_task())
+    archive = None
+    if args.record:
+        archive = HarArchive(args.record, RECORD)
+    elif args.replay:
+        archive = HarArchive(args.replay, REPLAY)
+        use_database(archive.replay_database())
+        print(f"Replaying {archive.path} (recorded {archive.started_at:%Y-%m-%d %H:%M}) into {archive.path / archive.REPLAY_DB_NAME}")
     init_db()
-    await search_glassdoor()
+    try:
+        if args.reviews:
+            show_reviews()
+            return
+        if args.unmatched:
+            show_unmatched()
+            return
+        if args.duplicates:
+            show_duplicates()
+            return
+        if archive and archive.recording:
+            backup_database(archive.database)
+        await search_glassdoor(resume=args.resume, archive=archive)
+    except asyncio.CancelledError:
+        if controls.restart_requested():
+            raise SystemExit(2)
+        raise
+    finally:
+        close_connection()
 
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        asyncio.run(main())
+        asyncio.run(main(args))
     except SystemExit as e:
-        if e.code == 2:
+        if e.code == 2 and controls.restart_requested():
             import os
-            os.execv(sys.executable, [sys.executable] + sys.argv)
+            # a restart picks up where the interrupted run stopped; run as a module again
+            # (the relative imports need it) from the same working directory
+            argv = sys.argv[1:] if "--resume" in sys.argv else sys.argv[1:] + ["--resume"]
+            os.execv(sys.executable, [sys.executable, "-m", "src.main", *argv])
         else:
             raise
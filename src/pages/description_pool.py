@@ -0,0 +1,67 @@
+# src/pages/description_pool.py
+import asyncio
+from .glassdoor_page import GlassdoorPage
+from ..utils.retry import RetryPolicy
+from ..utils.tracing import traced
+
+class DescriptionPool:
+    """
+    Bounded pool of extra pages in the same browser context used to open job detail
+    views concurrently. At most `size` descriptions are being fetched at any time;
+    further fetch() calls wait for a free page.
+    """
+
+    def __init__(self, context, size: int, wait_time: float = 3.0, wait_timeout: float = 10.0, retry: RetryPolicy = None,
+                 modal_guard: bool = False):
+        self.context = context
+        self.modal_guard = modal_guard
+        # one policy for all pool pages: they look up the same selectors
+        self.retry = retry or RetryPolicy()
+        self.size = max(1, size)
+        self.wait_time = wait_time
+        self.wait_timeout = wait_timeout
+        self._free = asyncio.Queue()
+        self._pages = []
+        self._opened = 0
+
+    async def _acquire(self) -> GlassdoorPage:
+        if self._free.empty() and self._opened < self.size:
+            # reserve the slot before awaiting so concurrent callers can't overshoot size
+            self._opened += 1
+            page = await self.context.new_page()
+            gd = GlassdoorPage(page, wait_time=self.wait_time, wait_timeout=self.wait_timeout, retry=self.retry)
+            if self.modal_guard:
+                await gd.install_modal_guard()
+            self._pages.append(gd)
+            return gd
+        return await self._free.get()
+
+    @traced()
+    async def fetch(self, url: str) -> str:
+        gd = await self._acquire()
+        try:
+            await gd.wait_while_paused()
+            try:
+                await gd.page.goto(url)
+            except Exception as e:
+                print(f"Description fetch failed for {url}: {e}")
+                return ""
+            return await gd.read_description()
+        finally:
+            self._free.put_nowait(gd)
+
+    async def close(self):
+        for gd in self._pages:
+            try:
+                await gd.page.close()
+            except Exception:
+                pass
+        self._pages = []
+        self._opened = 0
+        self._free = asyncio.Queue()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -0,0 +1,150 @@
+# src/pages/glassdoor_api.py
+"""
+Job data straight from the JSON (GraphQL/XHR) responses that fill Glassdoor's job list
+and job detail panes, instead of reading the rendered DOM.
+
+parse_payload() is a pure function over decoded JSON so it can be fed recorded payloads;
+JobResponseCapture hooks it to page.on("response").
+"""
+
+import asyncio
+from html.parser import HTMLParser
+
+# Only responses whose URL contains one of these are decoded.
+CAPTURE_URL_PATTERNS = ("/graph", "/api/", "joblisting", "jobview", "jobsearch")
+
+class _TextExtractor(HTMLParser):
+    BLOCK_TAGS = {"p", "br", "li", "div", "ul", "ol", "h1", "h2", "h3", "h4", "tr"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+def html_to_text(html: str) -> str:
+    """Plain text roughly as innerText would render it: one line per block element."""
+    if not html:
+        return ""
+    parser = _TextExtractor()
+    parser.feed(html)
+    lines = (" ".join(line.split()) for line in "".join(parser.parts).splitlines())
+    return "\n".join(line for line in lines if line)
+
+def _first(d: dict, *keys):
+    for key in keys:
+        value = d.get(key)
+        if value not in (None, ""):
+            return value
+    return None
+
+def _job_from_jobview(jobview: dict):
+    header = jobview.get("header") or {}
+    job = jobview.get("job") or {}
+    listing_id = _first(job, "listingId", "jobListingId") or _first(header, "jobListingId", "listingId")
+    if listing_id is None:
+        return None
+    employer = header.get("employer") or {}
+    description = html_to_text(_first(job, "description", "descriptionHtml") or "")
+    fragments = job.get("descriptionFragmentsText") or job.get("descriptionFragments") or []
+    return {
+        "listing_id": str(listing_id),
+        "title": _first(header, "jobTitleText") or _first(job, "jobTitleText", "title") or "",
+        "company": _first(header, "employerNameFromSearch") or _first(employer, "name", "shortName") or "",
+        "location": _first(header, "locationName") or "",
+        "href": _first(header, "jobLink", "seoJobLink") or "",
+        "description": description,
+        "snippet": " ".join(html_to_text(f) for f in fragments if isinstance(f, str)),
+    }
+
+def parse_payload(data):
+    """
+    Walk a decoded JSON payload (list-page or detail-page response, single or batched
+    GraphQL) and return the jobs found, in the dict shape get_jobs uses plus href/snippet.
+    """
+    jobs = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            jobview = node.get("jobview")
+            if isinstance(jobview, dict):
+                job = _job_from_jobview(jobview)
+                if job:
+                    jobs.append(job)
+                    continue
+            stack.extend(reversed(list(node.values())))
+    return jobs
+
+class JobResponseCapture:
+    """
+    Collects jobs from JSON responses of a page, keyed by listing id. Consumers pop() each
+    listing once its card is handled, so only jobs whose cards are still ahead are held;
+    payloads repeating a popped listing are ignored.
+    """
+
+    def __init__(self, url_patterns=CAPTURE_URL_PATTERNS):
+        self.url_patterns = tuple(p.lower() for p in url_patterns)
+        self.jobs = {}
+        self._consumed = set()
+        self.responses_parsed = 0
+        self._tasks = set()
+
+    def attach(self, page):
+        page.on("response", self._on_response)
+        return self
+
+    def _on_response(self, response):
+        if response.request.resource_type not in ("xhr", "fetch"):
+            return
+        if "json" not in (response.headers.get("content-type") or ""):
+            return
+        url = response.url.lower()
+        if not any(p in url for p in self.url_patterns):
+            return
+        task = asyncio.ensure_future(self._read(response))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _read(self, response):
+        try:
+            data = await response.json()
+        except Exception:
+            return
+        self.responses_parsed += 1
+        self.add_payload(data)
+
+    def add_payload(self, data):
+        for job in parse_payload(data):
+            self.merge(job)
+
+    def merge(self, job: dict):
+        """Keep the richest data per listing: later payloads fill in what earlier ones lacked."""
+        if job["listing_id"] in self._consumed:
+            return
+        current = self.jobs.setdefault(job["listing_id"], dict(job))
+        for key, value in job.items():
+            if value and (not current.get(key) or (key == "description" and len(value) > len(current[key]))):
+                current[key] = value
+
+    def get(self, listing_id):
+        return self.jobs.get(listing_id) if listing_id else None
+
+    def pop(self, listing_id):
+        """Like get, but releases the listing's data (its card has been consumed)."""
+        if not listing_id:
+            return None
+        self._consumed.add(listing_id)
+        return self.jobs.pop(listing_id, None)
+
+    async def settle(self):
+        """Wait for responses still being decoded."""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
@@ -1,7 +1,37 @@
 # src/pages/glassdoor_page.py  (MODIFIED)
 from ..utils.base_page import BasePage
 from ..utils import ui
+from ..keywords import KeywordMatcher
+from ..utils.tracing import tracer, traced
+from urllib.parse import urlparse, parse_qs
 import asyncio
+import json
+from collections import deque
+
+class HarvestOptions:
+    """
+    Per-run inputs and hooks of GlassdoorPage.get_jobs.
+    known_ids: listing ids already stored; those cards are skipped without opening them.
+    stop_ids: (incremental) stop paging once a whole batch of cards is in this set (jobs
+              known at the last successful crawl); with date-sorted results everything
+              after that batch is older.
+    on_ignored: callback receiving the listing id of each job dropped by the keyword filter.
+    on_page: (incremental) callback(n) after each load-more.
+    notify: callback(title, message, job) replacing the blocking keyword result message box
+            (e.g. to queue it in the DB for unattended runs).
+    duplicates: callback(job) returning a reference to a near-duplicate stored or scraped
+                earlier in the run (or None), e.g. JobWriter.check_duplicate; a duplicate is
+                still yielded (flagged duplicate_of) so its listing is known next time, but
+                not reported as a keyword result.
+    """
+
+    def __init__(self, known_ids=None, stop_ids=None, on_ignored=None, on_page=None, notify=None, duplicates=None):
+        self.known_ids = known_ids
+        self.stop_ids = stop_ids
+        self.on_ignored = on_ignored
+        self.on_page = on_page
+        self.notify = notify
+        self.duplicates = duplicates
 
 class GlassdoorPage(BasePage):
     MODAL_SELECTOR = '.modal_ModalContainer__GGVJc'
@@ -9,28 +39,111 @@ class GlassdoorPage(BasePage):
     SHOW_MORE_CTA = '[data-test="show-more-cta"]'
     TRACKING_LINK = '[class*="trackingLink"]'
     JOB_CARD_SELECTOR = '.jobCard'
+    SEARCH_TITLE_INPUT = '[aria-labelledby="searchBar-jobTitle_label"]'
+    SEARCH_LOCATION_INPUT = '[aria-labelledby="searchBar-location_label"]'
     TITLE_SELECTOR_PART = '[class*="jobTitle"]'
     COMPANY_SELECTOR_PART = '[class*="EmployerProfile"]'
     LOCATION_SELECTOR_PART = '[class*="JobCard_location"]'
     DESCRIPTION_SELECTOR_PART = '[class*="jobDescription"]'
+    LISTING_ID_ATTR = 'data-jobid'
+
+    # Dismisses MODAL_SELECTOR overlays as soon as they are added to the DOM (close button,
+    # or removal if it doesn't go away) and counts them in sessionStorage, which survives
+    # the tab's navigations. Installed per page with add_init_script, so it runs in every
+    # document before the site's own scripts.
+    MODAL_GUARD_JS = """(sel) => {
+        if (window.__rpaModalGuard) return;
+        window.__rpaModalGuard = true;
+        const bump = () => {
+            try {
+                sessionStorage.__rpaModalDismissed = String(Number(sessionStorage.__rpaModalDismissed || 0) + 1);
+            } catch (e) {
+                window.__rpaModalDismissed = (window.__rpaModalDismissed || 0) + 1;
+            }
+        };
+        const dismiss = (m) => {
+            if (m.__rpaDismissed) return;
+            m.__rpaDismissed = true;
+            const btn = m.querySelector('button') || m.querySelector('[aria-label="close"]');
+            if (btn) { btn.click(); } else { m.remove(); }
+            setTimeout(() => { if (m.isConnected) m.remove(); }, 500);
+            bump();
+        };
+        const scan = (node) => {
+            if (node.nodeType !== 1) return;
+            if (node.matches(sel)) dismiss(node);
+            node.querySelectorAll(sel).forEach(dismiss);
+        };
+        const start = () => {
+            scan(document.documentElement);
+            new MutationObserver((records) => {
+                for (const r of records) r.addedNodes.forEach(scan);
+            }).observe(document.documentElement, {childList: true, subtree: true});
+        };
+        if (document.documentElement) start();
+        else document.addEventListener("readystatechange", start, {once: true});
+    }"""
+    modal_guard = False
+    harvested_ids = ()
+
+    @staticmethod
+    def parse_listing_id(job_id: str = None, href: str = None):
+        """
+        Stable identity for a card: the card's data-jobid when present, otherwise the
+        jl / jobListingId query parameter of the tracking link, otherwise the link path.
+        """
+        if job_id:
+            return str(job_id).strip()
+        if not href:
+            return None
+        query = parse_qs(urlparse(href).query)
+        for key in ("jl", "jobListingId"):
+            if query.get(key):
+                return query[key][0]
+        return urlparse(href).path or href
 
     async def accept_cookies(self):
         await self.safe_click('button:has-text("Accept")')
 
     async def is_logged_in(self) -> bool:
-        el = await self.find_element('[aria-label="profile"]')
-        return el is not None
+        return await self.exists('[aria-label="profile"]')
 
+    @traced()
     async def search_job(self, job_title: str, country: str):
-        await self.fill_input('[aria-labelledby="searchBar-jobTitle_label"]', job_title)
-        await self.fill_input('[aria-labelledby="searchBar-location_label"]', country)
+        await self.fill_input(self.SEARCH_TITLE_INPUT, job_title)
+        await self.fill_input(self.SEARCH_LOCATION_INPUT, country)
         await self.page.keyboard.press("Enter")
-        await self.wait()
+        await self.wait_until(
+            "search_results", lambda ms: self.page.wait_for_selector(self.JOB_CARD_SELECTOR, timeout=ms))
 
+    async def install_modal_guard(self):
+        """Inject MODAL_GUARD_JS into this page's future documents and the current one."""
+        if self.modal_guard:
+            return
+        script = f"({self.MODAL_GUARD_JS})({json.dumps(self.MODAL_SELECTOR)})"
+        await self.page.add_init_script(script=script)
+        try:
+            await self.page.evaluate(script)
+        except Exception:
+            pass  # mid-navigation; the init script covers the next document
+        self.modal_guard = True
+
+    async def modal_dismissals(self) -> int:
+        """How many modals the guard has dismissed in this tab."""
+        try:
+            return await self.page.evaluate(
+                "() => Number(sessionStorage.__rpaModalDismissed || window.__rpaModalDismissed || 0)")
+        except Exception:
+            return 0
+
+    @traced()
     async def close_modal_if_exists(self):
+        if self.modal_guard:
+            # the guard handles modals in-page; only fall through if one is somehow still up
+            if not await self.count_elements(self.MODAL_SELECTOR):
+                return True
         for _ in range(3):
-            modal = await self.find_element(self.MODAL_SELECTOR, timeout=1500)
-            if not modal:
+            if not await self.exists(self.MODAL_SELECTOR, timeout=1500):
                 return True
             try:
                 await self.page.evaluate("""(sel) => {
@@ -39,96 +152,315 @@ class GlassdoorPage(BasePage):
                     const btn = m.querySelector('button') || m.querySelector('[aria-label="close"]');
                     if (btn) { btn.click(); } else { m.remove(); }
                 }""", self.MODAL_SELECTOR)
-                await self.wait(0.5)
+                tracer.count("modal.dismissed")
+                await self.wait_for_gone(self.MODAL_SELECTOR, timeout=2, fallback=0.5)
             except Exception:
                 pass
-        modal = await self.find_element(self.MODAL_SELECTOR, timeout=1000)
-        return modal is None
+        return not await self.exists(self.MODAL_SELECTOR, timeout=1000)
 
-    async def load_all_jobs(self):
-        while True:
+    @traced()
+    async def load_more(self) -> bool:
+        """Click load-more once and wait for the new cards; False when there is nothing more."""
+        if not self.modal_guard:
             await self.close_modal_if_exists()
-            btn = await self.find_element(self.SHOW_MORE_BUTTON, timeout=2000)
-            if not btn:
+        if not await self.exists(self.SHOW_MORE_BUTTON, timeout=2000):
+            return False
+        before = await self.count_elements(self.JOB_CARD_SELECTOR)
+        if not await self.safe_click(self.SHOW_MORE_BUTTON):
+            return False
+        await self.wait_for_count_increase(self.JOB_CARD_SELECTOR, before)
+        return True
+
+    @traced()
+    async def load_all_jobs(self, on_page=None, stop_ids=None):
+        """
+        Click load-more until it runs out. on_page(n) is called after the n-th successful load.
+        stop_ids: stop early once a page of (date-sorted) cards is made only of these listings.
+        """
+        pages = 0
+        while not (stop_ids is not None and self.all_known(await self.extract_cards(only_new=True), stop_ids)):
+            if not await self.load_more():
                 break
-            clicked = await self.safe_click(self.SHOW_MORE_BUTTON)
-            if not clicked:
+            pages += 1
+            if on_page:
+                on_page(pages)
+        return pages
+
+    @staticmethod
+    def all_known(cards, known_ids) -> bool:
+        """True when every card is a listing already in known_ids (an empty page counts as known)."""
+        known = all(card["listing_id"] and card["listing_id"] in known_ids for card in cards)
+        if known:
+            tracer.count("cards.known_page")
+        return known
+
+    @traced()
+    async def extract_cards(self, only_new: bool = False):
+        """
+        Read job card fields in a single page.evaluate round trip.
+        Every card is tagged with a stable data-rpa-idx (its `index`, used to click it later)
+        and marked as harvested; with only_new, cards harvested before are skipped.
+        Returns plain dicts: index, title, company, location, href, listing_id.
+        """
+        if not await self.exists(self.JOB_CARD_SELECTOR):
+            return []
+        cards = await self.page.evaluate("""(args) => {
+            const [cardSel, titleSel, companySel, locationSel, linkSel, idAttr, onlyNew] = args;
+            let next = window.__rpaCardSeq || 0;
+            const out = [];
+            for (const card of document.querySelectorAll(cardSel)) {
+                if (!card.hasAttribute("data-rpa-idx")) card.setAttribute("data-rpa-idx", String(next++));
+                if (onlyNew && card.hasAttribute("data-rpa-seen")) continue;
+                card.setAttribute("data-rpa-seen", "");
+                const text = (sel) => {
+                    const el = card.querySelector(sel);
+                    return el ? el.innerText.trim() : "";
+                };
+                const holder = card.closest(`[${idAttr}]`) || card.querySelector(`[${idAttr}]`);
+                const link = card.querySelector(linkSel);
+                out.push({
+                    index: Number(card.getAttribute("data-rpa-idx")),
+                    title: text(titleSel),
+                    company: text(companySel),
+                    location: text(locationSel),
+                    job_id: holder ? holder.getAttribute(idAttr) : null,
+                    href: link ? (link.href || "") : null,
+                });
+            }
+            window.__rpaCardSeq = next;
+            return out;
+        }""", [self.JOB_CARD_SELECTOR, self.TITLE_SELECTOR_PART, self.COMPANY_SELECTOR_PART,
+               self.LOCATION_SELECTOR_PART, self.TRACKING_LINK, self.LISTING_ID_ATTR, only_new])
+        for card in cards:
+            card["listing_id"] = self.parse_listing_id(card.pop("job_id"), card["href"])
+        return cards
+
+    @traced()
+    async def prune_cards(self, indexes, mode: str = "hide") -> int:
+        """
+        Shrink already-processed cards so a long result list doesn't keep growing the tab.
+        hide: only display:none; the card's children are left to React. collapse: also empty
+        the card, though React still owns those nodes and may fail re-rendering them (on a
+        selection change or after load-more); opt-in until checked against the live site.
+        The card element itself stays, so card counts (and load-more) keep working.
+        """
+        if mode not in ("collapse", "hide") or not indexes:
+            return 0
+        try:
+            return await self.page.evaluate("""([indexes, collapse]) => {
+                let pruned = 0;
+                for (const i of indexes) {
+                    const card = document.querySelector(`[data-rpa-idx="${i}"]`);
+                    if (!card) continue;
+                    if (collapse) card.replaceChildren();
+                    card.style.display = "none";
+                    pruned++;
+                }
+                return pruned;
+            }""", [list(indexes), mode == "collapse"])
+        except Exception:
+            return 0
+
+    @traced()
+    async def read_description(self) -> str:
+        """Expand and read the description of the job currently shown on this page."""
+        if not self.modal_guard:
+            await self.close_modal_if_exists()
+
+        if await self.exists(self.SHOW_MORE_CTA):
+            collapsed = len(await self.get_text(self.DESCRIPTION_SELECTOR_PART))
+            await self.safe_click(self.SHOW_MORE_CTA)
+            # expanded once the text grows or the CTA goes away
+            await self.wait_for_js(
+                "description_expanded",
+                """([descSel, ctaSel, n]) => {
+                    const d = document.querySelector(descSel);
+                    return !document.querySelector(ctaSel) || (d && d.innerText.trim().length > n);
+                }""",
+                [self.DESCRIPTION_SELECTOR_PART, self.SHOW_MORE_CTA, collapsed], timeout=5, fallback=2)
+
+        return await self.get_text(self.DESCRIPTION_SELECTOR_PART)
+
+    @traced()
+    async def open_description(self, index: int, title: str = "") -> str:
+        """Click the tracking link of the card tagged `index` by extract_cards and read the description pane."""
+        previous = ""
+        try:
+            previous = await self.page.evaluate("""(sel) => {
+                const d = document.querySelector(sel);
+                return d ? d.innerText.trim() : "";
+            }""", self.DESCRIPTION_SELECTOR_PART)
+            await self.page.evaluate("""([cardSel, linkSel, i]) => {
+                const card = document.querySelector(`${cardSel}[data-rpa-idx="${i}"]`);
+                const link = card && card.querySelector(linkSel);
+                if (!link) return;
+                link.scrollIntoView({block: "center"});
+                link.click();
+            }""", [self.JOB_CARD_SELECTOR, self.TRACKING_LINK, index])
+        except Exception:
+            pass
+
+        # the pane has switched once its text changes, or (first card, already shown)
+        # once a heading carries the clicked job's title
+        await self.wait_for_js(
+            "description_loaded",
+            """([descSel, prev, title]) => {
+                const d = document.querySelector(descSel);
+                if (!d) return false;
+                const text = d.innerText.trim();
+                if (text && text !== prev) return true;
+                return !!title && Array.from(document.querySelectorAll("h1, h2"))
+                    .some((h) => h.innerText.trim() === title);
+            }""",
+            [self.DESCRIPTION_SELECTOR_PART, previous, title], timeout=8, fallback=2)
+        return await self.read_description()
+
+    async def _card_batches(self, incremental: bool, prune: str, on_page=None, keep_paging=None):
+        """
+        All cards at once, or (incremental) the newly appended cards after each load-more.
+        keep_paging(): checked after each incremental batch; False stops before the next load.
+        """
+        if not incremental:
+            yield await self.extract_cards()
+            return
+        pages = 0
+        while True:
+            cards = await self.extract_cards(only_new=True)
+            yield cards
+            await self.prune_cards([c["index"] for c in cards], prune)
+            if keep_paging and not keep_paging():
+                break
+            if not await self.load_more():
                 break
-            await self.wait()
+            pages += 1
+            if on_page:
+                on_page(pages)
 
-    async def get_jobs(self, keywords=None):
+    async def get_jobs(self, keywords=None, pool=None, capture=None, incremental=False, prune="hide",
+                       keep_matched=False, options: HarvestOptions = None):
         """
-        keywords: list of strings to check inside title or description.
-        For each job, a validation message box will be shown and then a keyword result message (FOUND/NOT FOUND).
+        Async generator yielding scraped jobs as soon as each one is ready, in card order.
+        keywords: KeywordMatcher (or list of strings) to check inside title or description.
+                  The card title is checked first; a hit skips opening the description.
+        pool: optional DescriptionPool; when given, descriptions are fetched concurrently in
+              its pages while this page keeps enumerating cards.
+        capture: optional JobResponseCapture; a card whose full description already came in a
+                 JSON response is not opened, and empty card fields are filled from it.
+                 Each card's captured data is popped as the card is consumed.
+        incremental: page through the results here instead of after load_all_jobs: harvest the
+                     cards appended by each load-more, process them, then prune them (see
+                     prune_cards) so memory stays flat.
+        keep_matched: yield jobs the keywords match too (flagged keywords_found) instead of
+                      dropping them, so keyword changes can be re-applied to stored jobs later.
+                      A title hit then no longer skips the description.
+        options: HarvestOptions with this run's known/stop ids and callbacks.
+        Jobs no keyword matches are reported through options.notify, or else a message box.
+        Listing ids are recorded in harvest order in self.harvested_ids.
         """
-        if keywords is None:
-            keywords = []
-
-        job_cards = await self.find_elements(self.JOB_CARD_SELECTOR)
-        results = []
-
-        # import controls locally to avoid circular imports on module load
-        from ..utils.controls import is_paused
-
-        for job in job_cards:
-            # pause checking
-            while is_paused():
-                await asyncio.sleep(0.5)
-
-            title_el = await job.query_selector(self.TITLE_SELECTOR_PART)
-            company_el = await job.query_selector(self.COMPANY_SELECTOR_PART)
-            location_el = await job.query_selector(self.LOCATION_SELECTOR_PART)
-
-            title = (await title_el.inner_text()).strip() if title_el else ""
-            company = (await company_el.inner_text()).strip() if company_el else ""
-            location = (await location_el.inner_text()).strip() if location_el else ""
-
-            tracking = await job.query_selector(self.TRACKING_LINK)
-            description = ""
-            if tracking:
-                try:
-                    await tracking.scroll_into_view_if_needed()
-                except Exception:
-                    pass
-                try:
-                    await self.page.evaluate("(el) => el.click()", tracking)
-                except Exception:
-                    try:
-                        await tracking.click()
-                    except Exception:
-                        pass
-
-                await asyncio.sleep(2)
-                await self.close_modal_if_exists()
-
-                show_more_cta = await self.find_element(self.SHOW_MORE_CTA)
-                if show_more_cta:
-                    await self.safe_click(self.SHOW_MORE_CTA)
-                    await asyncio.sleep(2)  # increased to 2 seconds
-
-                desc_el = await self.find_element(self.DESCRIPTION_SELECTOR_PART)
-                if desc_el:
-                    try:
-                        description = (await desc_el.inner_text()).strip()
-                    except Exception:
-                        description = ""
-
-            # keyword check inside get_jobs (per requirement)
-            content = f"{title} {description}".lower()
-            found_kw = any((kw.lower() in content) for kw in keywords) if keywords else False
-
-            if found_kw:
-                print(f"IGNORADO: {title}")
-                continue
-            else:
-                ui.show_msgbox("Keyword Result", "NOT FOUND: no keywords matched.")
-
-            results.append({
-                "title": title,
-                "company": company,
-                "location": location,
-                "description": description,
-                "keywords_found": found_kw
-            })
-
-        return results
+        options = options or HarvestOptions()
+        stop_ids = options.stop_ids
+        if not isinstance(keywords, KeywordMatcher):
+            keywords = KeywordMatcher(keywords or [])
+        known_ids = set(options.known_ids or ())
+        self.harvested_ids = []
+        # jobs whose description is still being fetched by the pool, oldest first
+        pending = deque()
+        max_pending = pool.size * 2 if pool else 0
+        paging = {"more": True}
+
+        try:
+            async for cards in self._card_batches(incremental, prune, options.on_page,
+                                                  keep_paging=(lambda: paging["more"]) if stop_ids is not None else None):
+                if stop_ids is not None:
+                    paging["more"] = not self.all_known(cards, stop_ids)
+                self.harvested_ids.extend(c["listing_id"] for c in cards if c["listing_id"])
+                if capture:
+                    await capture.settle()
+                for card in cards:
+                    await self.wait_while_paused()
+
+                    listing_id = card["listing_id"]
+                    # released whatever happens to the card, so captured payloads don't pile up
+                    captured = capture.pop(listing_id) if capture else None
+                    if listing_id and listing_id in known_ids:
+                        tracer.count("cards.known")
+                        continue
+                    if listing_id:
+                        known_ids.add(listing_id)
+
+                    title_kw = None if keep_matched else keywords.search(card["title"])
+                    if title_kw:
+                        tracer.count("cards.title_rejected")
+                        print(f"IGNORADO: {card['title']} (title: {title_kw})")
+                        if options.on_ignored:
+                            options.on_ignored(listing_id)
+                        continue
+
+                    job = {
+                        "title": card["title"],
+                        "company": card["company"],
+                        "location": card["location"],
+                        "listing_id": listing_id,
+                    }
+                    if captured:
+                        for key in ("title", "company", "location"):
+                            job[key] = job[key] or captured.get(key, "")
+                    description = ""
+                    if captured and captured.get("description"):
+                        description = captured["description"]
+                        tracer.count("description.captured")
+                    elif card["href"] is not None:
+                        if pool and card["href"]:
+                            description = asyncio.ensure_future(pool.fetch(card["href"]))
+                        else:
+                            description = await self.open_description(card["index"], card["title"])
+                    pending.append((job, description))
+
+                    while pending and (len(pending) > max_pending or not asyncio.isfuture(pending[0][1]) or pending[0][1].done()):
+                        ready = await self._finish_job(*pending.popleft(), keywords, options, keep_matched)
+                        if ready:
+                            yield ready
+
+            while pending:
+                ready = await self._finish_job(*pending.popleft(), keywords, options, keep_matched)
+                if ready:
+                    yield ready
+        finally:
+            # consumer stopped early (abort/error): don't leave fetches running
+            for _, description in pending:
+                if asyncio.isfuture(description):
+                    description.cancel()
+
+    async def _finish_job(self, job, description, keywords, options: HarvestOptions, keep_matched=False):
+        """Attach the description and apply the keyword filter; returns None for ignored jobs."""
+        if asyncio.isfuture(description):
+            description = await description
+        job["description"] = description
+
+        # keyword check inside get_jobs (per requirement); the title was already checked
+        # unless matched jobs are kept. Each field on its own, as the stored matches are.
+        texts = (job["title"], description) if keep_matched else (description,)
+        found_kw = any(keywords.search(text) is not None for text in texts)
+
+        if found_kw and keep_matched:
+            tracer.count("cards.matched")
+            print(f"MATCHED (stored): {job['title']}")
+        elif found_kw:
+            tracer.count("cards.description_rejected")
+            print(f"IGNORADO: {job['title']}")
+            if options.on_ignored:
+                options.on_ignored(job["listing_id"])
+            return None
+        elif options.duplicates and (duplicate_of := options.duplicates(job)) is not None:
+            # same vacancy as a stored job (repost, other location, new id): nothing new to review
+            tracer.count("cards.duplicate")
+            print(f"DUPLICATE of {duplicate_of}: {job['title']} - {job['company']}")
+            job["duplicate_of"] = duplicate_of
+        elif options.notify:
+            options.notify("Keyword Result", "NOT FOUND: no keywords matched.", job)
+        else:
+            # in a thread so other concurrent searches keep running while this one waits
+            await asyncio.to_thread(ui.show_msgbox, "Keyword Result", "NOT FOUND: no keywords matched.")
+
+        job["keywords_found"] = found_kw
+        return job
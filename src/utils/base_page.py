@@ -1,91 +1,233 @@
-from playwright.async_api import Page, Error as PlaywrightError
+from playwright.async_api import Page, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
 from typing import Optional, List
 import asyncio
+import time
+from .retry import RetryPolicy
+from .tracing import tracer, traced
 
 DEFAULT_CLICK_RETRIES = 8
 DEFAULT_CLICK_WAIT = 0.5
+DEFAULT_CLICK_BUDGET = 8.0      # seconds for a whole safe_click, all attempts included
+DEFAULT_ACTION_BUDGET = 5.0     # click / fill_input / get_text
+DEFAULT_EVAL_BUDGET = 2.0
+DEFAULT_WAIT_TIMEOUT = 10.0
 
 class BasePage:
-    def __init__(self, page: Page, wait_time: float = 3.0):
+    def __init__(self, page: Page, wait_time: float = 3.0, wait_timeout: float = DEFAULT_WAIT_TIMEOUT, retry: RetryPolicy = None):
         self.page = page
+        # shared with other pages of the same site so the per-selector breakers learn together
+        self.retry = retry or RetryPolicy()
         self.wait_time = wait_time
+        self.wait_timeout = wait_timeout
+        # name -> {"count", "total", "max", "timeouts"} for every condition wait
+        self.wait_stats = {}
 
     async def wait(self, seconds: float = None):
+        """Fixed delay. Prefer the wait_for_* helpers; this is only the fallback."""
         await asyncio.sleep(seconds or self.wait_time)
 
+    def _record_wait(self, name: str, elapsed: float, timed_out: bool):
+        stat = self.wait_stats.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0, "timeouts": 0})
+        stat["count"] += 1
+        stat["total"] += elapsed
+        stat["max"] = max(stat["max"], elapsed)
+        if timed_out:
+            stat["timeouts"] += 1
+            tracer.count(f"wait.{name}.timeout")
+        tracer.record(f"wait.{name}", elapsed)
+
+    async def wait_until(self, name: str, condition, timeout: float = None, fallback: float = None) -> bool:
+        """
+        Await `condition(timeout_ms)` (a coroutine factory that raises on timeout) and record
+        how long it took under `name`. Returns True when the condition was met, False when
+        the timeout ceiling was hit. If the condition can't be evaluated at all (page
+        navigating, closed, ...) the fixed `fallback` delay is slept instead.
+        """
+        timeout = self.wait_timeout if timeout is None else timeout
+        start = time.monotonic()
+        met = False
+        try:
+            await condition(int(timeout * 1000))
+            met = True
+        except PlaywrightTimeoutError:
+            pass
+        except PlaywrightError:
+            await self.wait(fallback)
+        self._record_wait(name, time.monotonic() - start, timed_out=not met)
+        return met
+
+    async def wait_for_js(self, name: str, expression: str, arg=None, timeout: float = None, fallback: float = None) -> bool:
+        """Wait until a JS predicate returns truthy in the page."""
+        return await self.wait_until(
+            name, lambda ms: self.page.wait_for_function(expression, arg=arg, timeout=ms), timeout, fallback)
+
+    async def wait_for_count_increase(self, selector: str, previous: int, timeout: float = None, fallback: float = None) -> bool:
+        """Wait until more than `previous` elements match `selector`."""
+        return await self.wait_for_js(
+            f"count:{selector}",
+            "([sel, n]) => document.querySelectorAll(sel).length > n",
+            [selector, previous], timeout, fallback)
+
+    async def wait_for_text_change(self, selector: str, previous: str, timeout: float = None, fallback: float = None) -> bool:
+        """Wait until the first `selector` match has non-empty text different from `previous`."""
+        return await self.wait_for_js(
+            f"text:{selector}",
+            """([sel, prev]) => {
+                const el = document.querySelector(sel);
+                const text = el ? el.innerText.trim() : "";
+                return text !== "" && text !== prev;
+            }""",
+            [selector, previous], timeout, fallback)
+
+    async def wait_for_gone(self, selector: str, timeout: float = None, fallback: float = None) -> bool:
+        """Wait until no element matches `selector`."""
+        return await self.wait_until(
+            f"gone:{selector}",
+            lambda ms: self.page.wait_for_selector(selector, state="detached", timeout=ms), timeout, fallback)
+
+    async def wait_for_network_idle(self, timeout: float = None, fallback: float = None) -> bool:
+        """Wait for network quiescence (no requests for 500ms)."""
+        return await self.wait_until(
+            "network_idle", lambda ms: self.page.wait_for_load_state("networkidle", timeout=ms), timeout, fallback)
+
+    async def wait_for_element(self, selector: str, timeout: float = None, fallback: float = None) -> bool:
+        """Wait until `selector` is attached to the page."""
+        return await self.wait_until(
+            f"element:{selector}", lambda ms: self.page.wait_for_selector(selector, state="attached", timeout=ms),
+            timeout, fallback)
+
+    async def wait_for_ready(self, selector: str, timeout: float = None) -> bool:
+        """
+        Wait for the element the next step needs. Sites that keep polling rarely go network
+        idle, so that is only a fallback, capped at wait_time, when the element doesn't show.
+        """
+        if await self.wait_for_element(selector, timeout, fallback=self.wait_time):
+            return True
+        await self.wait_for_network_idle(timeout=min(self.wait_time, self.wait_timeout), fallback=self.wait_time)
+        return False
+
+    async def wait_while_paused(self, poll: float = 0.5):
+        # import controls locally to avoid circular imports on module load
+        from .controls import is_paused
+        while is_paused():
+            await asyncio.sleep(poll)
+
+    @traced()
     async def find_element(self, selector: str, timeout: int = 5000) -> Optional[object]:
+        """Wait up to `timeout` ms for `selector`; transient errors (navigation) are retried."""
+        return await self.retry.run(
+            selector, lambda t, final: self.page.wait_for_selector(selector, timeout=int(t * 1000)),
+            budget=timeout / 1000, attempt_timeout=None)
+
+    async def exists(self, selector: str, timeout: int = 5000) -> bool:
+        """Like find_element, but only answers whether it appeared and releases the handle."""
+        el = await self.find_element(selector, timeout=timeout)
+        await self.dispose(el)
+        return el is not None
+
+    @staticmethod
+    async def dispose(el):
+        """Release an ElementHandle so the browser can free the node it pins."""
+        if el is None:
+            return
         try:
-            return await self.page.wait_for_selector(selector, timeout=timeout)
+            await el.dispose()
         except PlaywrightError:
-            return None
+            pass
 
+    @traced()
     async def find_elements(self, selector: str, timeout: int = 5000) -> List[object]:
-        try:
-            await self.page.wait_for_selector(selector, timeout=timeout)
+        async def attempt(t, final):
+            await self.page.wait_for_selector(selector, timeout=int(t * 1000))
             return await self.page.query_selector_all(selector)
-        except PlaywrightError:
-            return []
+        return await self.retry.run(selector, attempt, budget=timeout / 1000, attempt_timeout=None) or []
 
+    @traced()
+    async def count_elements(self, selector: str) -> int:
+        count = await self.retry.run(
+            f"count:{selector}",
+            lambda t, final: self.page.evaluate("(sel) => document.querySelectorAll(sel).length", selector),
+            budget=DEFAULT_EVAL_BUDGET, ok=lambda n: n is not None, breaker=False)
+        return count or 0
+
+    async def _with_element(self, selector: str, action, budget: float, attempts: int = None,
+                            retry_wait: float = None, ok=bool):
+        """
+        Run `action(el, deadline, final)` on the element matching `selector` under the retry
+        policy: each attempt looks the element up and acts before `deadline` (monotonic
+        seconds; see _ms), then releases the handle. Returns the first result `ok` accepts.
+        """
+        async def attempt(t, final):
+            deadline = time.monotonic() + t
+            el = await self.page.wait_for_selector(selector, timeout=int(t * 1000))
+            if not el:
+                return None
+            try:
+                return await action(el, deadline, final)
+            finally:
+                await self.dispose(el)
+        return await self.retry.run(selector, attempt, budget=budget, attempts=attempts, base_delay=retry_wait, ok=ok)
+
+    @staticmethod
+    def _ms(deadline: float) -> int:
+        """Milliseconds left until `deadline` (at least a few, so calls fail fast rather than wait forever)."""
+        return max(int((deadline - time.monotonic()) * 1000), 50)
+
+    @traced()
     async def click(self, selector: str) -> bool:
-        el = await self.find_element(selector)
-        if not el:
-            return False
-        try:
-            await el.click()
+        async def action(el, deadline, final):
+            await el.click(timeout=self._ms(deadline))
             return True
-        except PlaywrightError:
-            return False
+        return bool(await self._with_element(selector, action, budget=DEFAULT_ACTION_BUDGET))
 
-    async def safe_click(self, selector: str, retries: int = DEFAULT_CLICK_RETRIES, retry_wait: float = DEFAULT_CLICK_WAIT, force: bool = True) -> bool:
-        for attempt in range(retries):
-            el = await self.find_element(selector, timeout=2000)
-            if not el:
-                await asyncio.sleep(retry_wait)
-                continue
+    @traced()
+    async def safe_click(self, selector: str, retries: int = DEFAULT_CLICK_RETRIES, retry_wait: float = DEFAULT_CLICK_WAIT,
+                         force: bool = True, budget: float = DEFAULT_CLICK_BUDGET) -> bool:
+        """
+        Click with retries, within `budget` seconds in total (not per attempt). Attempts
+        back off from `retry_wait`; the final one falls back to a JS click, then a forced click.
+        """
+        async def action(el, deadline, final):
             try:
                 try:
-                    await el.wait_for_element_state("visible", timeout=2000)
+                    await el.wait_for_element_state("visible", timeout=self._ms(deadline))
                 except PlaywrightError:
                     pass
-                await el.click()
+                await el.click(timeout=self._ms(deadline))
                 return True
             except PlaywrightError:
+                tracer.count("safe_click.retry")
                 try:
-                    await el.scroll_into_view_if_needed()
+                    await el.scroll_into_view_if_needed(timeout=self._ms(deadline))
                 except PlaywrightError:
                     pass
-                await asyncio.sleep(retry_wait)
-                if attempt == retries - 1:
-                    try:
-                        await self.page.evaluate("(el) => el.click()", el)
-                        return True
-                    except PlaywrightError:
-                        try:
-                            await el.click(force=force)
-                            return True
-                        except PlaywrightError:
-                            pass
-        return False
+                if not final:
+                    return False
+                try:
+                    await self.page.evaluate("(el) => el.click()", el)
+                    return True
+                except PlaywrightError:
+                    await el.click(force=force, timeout=self._ms(deadline))
+                    return True
+        return bool(await self._with_element(selector, action, budget=budget, attempts=retries, retry_wait=retry_wait))
 
+    @traced()
     async def fill_input(self, selector: str, text: str) -> bool:
-        el = await self.find_element(selector)
-        if not el:
-            return False
-        try:
-            await el.fill(text)
-            return True
-        except PlaywrightError:
+        async def action(el, deadline, final):
             try:
-                await self.page.evaluate("""(sel, val) => { document.querySelector(sel).value = val; }""", selector, text)
-                return True
+                await el.fill(text, timeout=self._ms(deadline))
             except PlaywrightError:
-                return False
+                # set the value directly and let the page's listeners know
+                await el.evaluate("""(el, val) => {
+                    el.value = val;
+                    el.dispatchEvent(new Event("input", {bubbles: true}));
+                    el.dispatchEvent(new Event("change", {bubbles: true}));
+                }""", text)
+            return True
+        return bool(await self._with_element(selector, action, budget=DEFAULT_ACTION_BUDGET))
 
+    @traced()
     async def get_text(self, selector: str) -> str:
-        el = await self.find_element(selector)
-        if not el:
-            return ""
-        try:
-            return (await el.inner_text()).strip()
-        except PlaywrightError:
-            return ""
+        async def action(el, deadline, final):
+            return (await el.inner_text(timeout=self._ms(deadline))).strip()
+        return await self._with_element(selector, action, budget=DEFAULT_ACTION_BUDGET, ok=lambda text: text is not None) or ""
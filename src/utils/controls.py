@@ -1,25 +1,61 @@
 # src/utils/controls.py  (NEW)
-import keyboard
 import os
 import threading
 import time
 from .shortcuts import SHORTCUTS
-from .ui import show_overlay
+from .ui import IS_WINDOWS, show_overlay
 
 # Global control state
 _state = {
     "paused": False,
     "stop_event": None,   # overlay stop_event
-    "restart_requested": False
+    "restart_requested": False,
+    "restart_target": None,  # (loop, task) cancelled by the restart hotkey
 }
 
+# Callables run (from the hotkey thread) right before kill/restart hard-exit the process,
+# e.g. to flush buffered DB writes.
+_exit_hooks = []
+
+def register_exit_hook(fn):
+    _exit_hooks.append(fn)
+
+def unregister_exit_hook(fn):
+    if fn in _exit_hooks:
+        _exit_hooks.remove(fn)
+
+def _run_exit_hooks():
+    for fn in list(_exit_hooks):
+        try:
+            fn()
+        except Exception as e:
+            print("Exit hook failed:", e)
+
 def _kill_action():
     """Kill the process immediately."""
+    _run_exit_hooks()
     os._exit(1)
 
+def set_restart_target(task, loop=None):
+    """
+    Task the restart hotkey cancels (from its own thread, via the loop). Cancelling runs
+    the task's cleanup (DB writes are flushed, checkpoints kept); the caller then sees
+    restart_requested() and starts over with --resume.
+    """
+    _state["restart_target"] = (loop or task.get_loop(), task)
+
+def restart_requested() -> bool:
+    return _state["restart_requested"]
+
 def _restart_action():
-    """Set restart flag so main can handle it (simple approach: exit with special code)."""
+    """Cancel the main task so main can re-exec with --resume; hard exit (code 2) if none is set."""
     _state["restart_requested"] = True
+    target = _state["restart_target"]
+    if target and not target[1].done():
+        loop, task = target
+        loop.call_soon_threadsafe(task.cancel)
+        return
+    _run_exit_hooks()
     os._exit(2)
 
 def _pause_action():
@@ -40,6 +76,8 @@ def _resume_action():
 
 def install_hotkeys():
     """Install global hotkeys. Run this in a separate thread so it doesn't block."""
+    # imported here: loading keyboard is only worth it for an interactive run
+    import keyboard
     # Kill
     keyboard.add_hotkey(SHORTCUTS["kill"], _kill_action, suppress=True)
     # Restart
@@ -49,8 +87,10 @@ def install_hotkeys():
     # Resume
     keyboard.add_hotkey(SHORTCUTS["resume"], _resume_action, suppress=True)
 
-def start_listeners():
-    """Start hotkeys in a daemon thread."""
+def start_listeners(enabled: bool = True):
+    """Start hotkeys in a daemon thread. No-op off Windows or when disabled (unattended runs)."""
+    if not (enabled and IS_WINDOWS):
+        return
     thr = threading.Thread(target=install_hotkeys, daemon=True)
     thr.start()
 
@@ -0,0 +1,96 @@
+# src/utils/har.py
+"""
+Record and replay a scrape's network traffic.
+
+An archive is a directory holding one HAR (zip) per browser context, session.json (when
+recording started) and jobsearch.db, the database as it was at that moment. Replaying
+serves every request from the HARs through context.route_from_har and aborts whatever
+they don't contain, so nothing reaches the network. It runs against a fresh copy of the
+database (replay.db), which gives the same known jobs, keywords and watermarks as the
+recorded run, and the same search URLs.
+
+    python -m src.main --record data/har/uk-visa     # a normal run, recorded
+    python -m src.main --replay data/har/uk-visa     # offline, deterministic, headless
+
+Requests that differ between runs (random tokens, timestamps in query strings or POST
+bodies) miss the archive and are aborted.
+"""
+
+import json
+import re
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+RECORD = "record"
+REPLAY = "replay"
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^\w-]+", "_", name).strip("_").lower() or "session"
+
+class HarArchive:
+    DB_NAME = "jobsearch.db"
+    REPLAY_DB_NAME = "replay.db"
+    META_NAME = "session.json"
+
+    def __init__(self, path, mode: str):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown HAR archive mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self._contexts = set()
+        if mode == RECORD:
+            self.path.mkdir(parents=True, exist_ok=True)
+            # HARs left by an earlier recording would be replayed along with this one
+            for old in self.path.glob("*.har.zip"):
+                old.unlink()
+            self.started_at = datetime.now()
+            (self.path / self.META_NAME).write_text(json.dumps({"started_at": self.started_at.isoformat()}))
+            self.hars = []
+        else:
+            meta = self.path / self.META_NAME
+            self.hars = sorted(self.path.glob("*.har.zip"))
+            if not meta.exists() or not self.hars:
+                raise FileNotFoundError(f"No recorded session in {self.path} (record one with --record)")
+            self.started_at = datetime.fromisoformat(json.loads(meta.read_text())["started_at"])
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == RECORD
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY
+
+    @property
+    def database(self) -> Path:
+        """Where the recording's database snapshot lives."""
+        return self.path / self.DB_NAME
+
+    def replay_database(self) -> Path:
+        """A fresh copy of the snapshot for one replay (its results can be inspected afterwards)."""
+        if not self.database.exists():
+            raise FileNotFoundError(f"No database snapshot in {self.path}")
+        target = self.path / self.REPLAY_DB_NAME
+        for stale in (target, Path(f"{target}-wal"), Path(f"{target}-shm")):
+            stale.unlink(missing_ok=True)
+        shutil.copyfile(self.database, target)
+        return target
+
+    async def install(self, context, name: str):
+        """
+        Record: save the context's traffic to <name>.har.zip (written when the context closes).
+        Replay: serve the context from every HAR of the archive; a request none of them
+        holds is aborted. Once per context.
+        """
+        if id(context) in self._contexts:
+            return
+        self._contexts.add(id(context))
+        if self.recording:
+            har = self.path / f"{_slug(name)}.har.zip"
+            self.hars.append(har)
+            await context.route_from_har(har, update=True, update_content="attach", update_mode="full")
+            return
+        # routes registered later are tried first; misses fall back down to the first, which aborts
+        for n, har in enumerate(self.hars):
+            await context.route_from_har(har, not_found="abort" if n == 0 else "fallback")
@@ -0,0 +1,108 @@
+# src/utils/network.py
+"""
+Request blocking for Playwright contexts.
+NetworkPolicy decides per request (resource type + host) whether to let it through,
+aborts the rest via context.route and keeps counters of what was allowed and blocked.
+"""
+
+from collections import Counter
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+# Hosts never blocked, whatever the type/domain rules say (login and bot challenges)
+ALWAYS_ALLOW = ("challenges.cloudflare.com", "recaptcha.net", "www.google.com/recaptcha", "hcaptcha.com")
+
+TRACKER_DOMAINS = (
+    "doubleclick.net", "googlesyndication.com", "google-analytics.com", "googletagmanager.com",
+    "googleadservices.com", "facebook.net", "facebook.com", "connect.facebook.net", "hotjar.com",
+    "bat.bing.com", "adsrvr.org", "criteo.com", "criteo.net", "scorecardresearch.com", "quantserve.com",
+    "demdex.net", "omtrdc.net", "optimizely.com", "segment.io", "segment.com", "nr-data.net",
+    "newrelic.com", "analytics.tiktok.com", "ads.linkedin.com", "px.ads.linkedin.com", "snap.licdn.com",
+    "static.ads-twitter.com", "amazon-adsystem.com", "taboola.com", "outbrain.com", "onetrust.com",
+    "cookielaw.org", "branch.io", "braze.com", "sentry.io", "datadoghq.com",
+)
+
+PROFILES = {
+    "off": {},
+    # only what the scraper needs: documents, scripts, XHR/fetch and styles
+    "glassdoor": {
+        "block_types": ("image", "media", "font", "beacon", "ping", "manifest", "texttrack"),
+        "block_domains": TRACKER_DOMAINS,
+    },
+    # also drops stylesheets; selectors don't depend on them, but layout-driven clicks may
+    "strict": {
+        "block_types": ("image", "media", "font", "beacon", "ping", "manifest", "texttrack", "stylesheet", "other"),
+        "block_domains": TRACKER_DOMAINS,
+    },
+}
+
+def _host_matches(host: str, url: str, domains: Iterable[str]) -> bool:
+    for domain in domains:
+        if "/" in domain:
+            if domain in url:
+                return True
+        elif host == domain or host.endswith("." + domain):
+            return True
+    return False
+
+class NetworkPolicy:
+    def __init__(self, block_types: Iterable[str] = (), block_domains: Iterable[str] = (),
+                 allow_domains: Iterable[str] = ALWAYS_ALLOW):
+        self.block_types = {t.strip().lower() for t in block_types if t.strip()}
+        self.block_domains = tuple(d.strip().lower() for d in block_domains if d.strip())
+        self.allow_domains = tuple(d.strip().lower() for d in allow_domains if d.strip())
+        self.allowed = Counter()
+        self.blocked = Counter()
+        self.allowed_bytes = 0
+        self._contexts = set()
+
+    @classmethod
+    def from_profile(cls, name: str, extra_block_types: Iterable[str] = (), extra_block_domains: Iterable[str] = ()) -> Optional["NetworkPolicy"]:
+        """Build a policy from a named profile plus extra rules; None for 'off' with no extras."""
+        profile = PROFILES.get((name or "off").lower())
+        if profile is None:
+            raise ValueError(f"Unknown network profile: {name} (choose from {', '.join(PROFILES)})")
+        block_types = tuple(profile.get("block_types", ())) + tuple(extra_block_types)
+        block_domains = tuple(profile.get("block_domains", ())) + tuple(extra_block_domains)
+        if not block_types and not block_domains:
+            return None
+        return cls(block_types, block_domains)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        parsed = urlparse(url)
+        if parsed.scheme in ("data", "blob", "about"):
+            return False
+        host = (parsed.hostname or "").lower()
+        if _host_matches(host, url, self.allow_domains):
+            return False
+        if resource_type in self.block_types:
+            return True
+        return _host_matches(host, url, self.block_domains)
+
+    async def _handle(self, route):
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self.blocked[request.resource_type] += 1
+            await route.abort("blockedbyclient")
+        else:
+            self.allowed[request.resource_type] += 1
+            await route.continue_()
+
+    def _on_response(self, response):
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self.allowed_bytes += int(length)
+
+    async def install(self, context):
+        """Route every request of the context through this policy (once per context)."""
+        if id(context) in self._contexts:
+            return
+        self._contexts.add(id(context))
+        await context.route("**/*", self._handle)
+        context.on("response", self._on_response)
+
+    def summary(self) -> str:
+        allowed, blocked = sum(self.allowed.values()), sum(self.blocked.values())
+        top = ", ".join(f"{t}={n}" for t, n in self.blocked.most_common(5))
+        return (f"Network: {allowed} requests allowed ({self.allowed_bytes / 1024 / 1024:.1f} MiB by content-length), "
+                f"{blocked} blocked ({top or 'none'}); blocked bytes are never downloaded, so not measured")
@@ -0,0 +1,132 @@
+# src/utils/retry.py
+"""
+Time-budgeted retries for page lookups and actions.
+
+Every operation gets a total time budget and a maximum number of attempts; between
+attempts it backs off exponentially with jitter. A per-key (selector) circuit breaker
+opens after a few consecutive failed operations: while open, operations on that key get
+one short probe instead of their full budget, so a button that is simply not on the
+page stops costing seconds on every call. Attempts, failures and time are kept per key.
+"""
+
+import asyncio
+import random
+import time
+from playwright.async_api import Error as PlaywrightError
+from .tracing import tracer
+
+_UNSET = object()
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failed operations, for `cooldown` seconds."""
+
+    def __init__(self, threshold: int = 3, cooldown: float = 30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def is_open(self) -> bool:
+        if self.opened_at is None:
+            return False
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            # half-open: the next operation gets its full budget; one more failure reopens
+            self.opened_at = None
+            self.failures = self.threshold - 1
+            return False
+        return True
+
+    def record(self, ok: bool):
+        if ok:
+            self.failures = 0
+            self.opened_at = None
+            return
+        self.failures += 1
+        if self.failures >= self.threshold and self.opened_at is None:
+            self.opened_at = time.monotonic()
+
+class RetryPolicy:
+    """
+    budget: default total seconds per operation; attempts: default maximum attempts.
+    attempt_timeout: ceiling for a single attempt (None = whatever budget is left).
+    base_delay / max_delay / jitter: backoff n sleeps min(max_delay, base_delay * 2**n),
+    shortened by up to `jitter` (a fraction) at random.
+    breaker_threshold / breaker_cooldown / probe_timeout: see CircuitBreaker.
+    """
+
+    def __init__(self, budget: float = 10.0, attempts: int = 8, attempt_timeout: float = 2.0,
+                 base_delay: float = 0.25, max_delay: float = 2.0, jitter: float = 0.5,
+                 breaker_threshold: int = 3, breaker_cooldown: float = 30.0, probe_timeout: float = 0.25):
+        self.budget = budget
+        self.attempts = attempts
+        self.attempt_timeout = attempt_timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.probe_timeout = probe_timeout
+        # key -> {"operations", "attempts", "failures", "short_circuits", "total", "max"}
+        self.stats = {}
+        self._breakers = {}
+
+    def backoff(self, n: int, base_delay: float = None) -> float:
+        delay = min(self.max_delay, (self.base_delay if base_delay is None else base_delay) * 2 ** n)
+        return delay * (1 - self.jitter * random.random())
+
+    def breaker(self, key: str) -> CircuitBreaker:
+        if key not in self._breakers:
+            self._breakers[key] = CircuitBreaker(self.breaker_threshold, self.breaker_cooldown)
+        return self._breakers[key]
+
+    async def run(self, key: str, attempt, budget: float = None, attempts: int = None,
+                  attempt_timeout=_UNSET, base_delay: float = None, ok=bool, breaker: bool = True):
+        """
+        Call `attempt(timeout, final)` until it returns a result `ok` accepts, within the
+        budget and attempt limit. A PlaywrightError counts as a failed attempt. `final` is
+        True when no further attempt is expected (last-resort fallbacks go there).
+        Returns the accepted result, or None.
+        """
+        budget = self.budget if budget is None else budget
+        attempts = self.attempts if attempts is None else max(1, attempts)
+        per_attempt = self.attempt_timeout if attempt_timeout is _UNSET else attempt_timeout
+        stat = self.stats.setdefault(key, {"operations": 0, "attempts": 0, "failures": 0,
+                                           "short_circuits": 0, "total": 0.0, "max": 0.0})
+        cb = self.breaker(key) if breaker else None
+        if cb and cb.is_open:
+            budget, attempts = min(budget, self.probe_timeout), 1
+            stat["short_circuits"] += 1
+            tracer.count("retry.short_circuit")
+
+        start = time.monotonic()
+        deadline = start + budget
+        result, accepted, n = None, False, 0
+        while n < attempts:
+            remaining = max(deadline - time.monotonic(), 0.05)
+            timeout = remaining if per_attempt is None else min(per_attempt, remaining)
+            delay = self.backoff(n, base_delay)
+            final = n == attempts - 1 or remaining - timeout < delay
+            n += 1
+            try:
+                result = await attempt(timeout, final)
+                accepted = ok(result)
+            except PlaywrightError:
+                accepted = False
+            if accepted or n >= attempts:
+                break
+            left = deadline - time.monotonic()
+            if left <= 0:
+                break
+            tracer.count("retry.backoff")
+            await asyncio.sleep(min(delay, left))
+
+        elapsed = time.monotonic() - start
+        if cb:
+            cb.record(accepted)
+        stat["operations"] += 1
+        stat["attempts"] += n
+        stat["failures"] += 0 if accepted else 1
+        stat["total"] += elapsed
+        stat["max"] = max(stat["max"], elapsed)
+        return result if accepted else None
@@ -0,0 +1,95 @@
+# src/utils/tracing.py
+"""
+Lightweight spans and counters for finding where a run spends its time.
+Disabled (TRACE=False, which follows DEBUG by default) every hook is a single flag check.
+
+    @traced()                      # sync or async functions, named after __qualname__
+    async def load_more(self): ...
+
+    with tracer.span("db.flush"):
+        ...
+
+    tracer.count("safe_click.retry")
+"""
+
+import asyncio
+import functools
+import statistics
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from ..config import TRACE
+
+class Tracer:
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self):
+        self.durations = defaultdict(list)
+        self.counters = Counter()
+
+    def record(self, name: str, seconds: float):
+        if self.enabled:
+            self.durations[name].append(seconds)
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled:
+            self.counters[name] += n
+
+    @contextmanager
+    def span(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name].append(time.perf_counter() - start)
+
+    def summary(self) -> dict:
+        """name -> count, total, mean, p50, p95, max (seconds)."""
+        stages = {}
+        for name, values in self.durations.items():
+            ordered = sorted(values)
+            pct = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else ordered * 99
+            stages[name] = {
+                "count": len(ordered),
+                "total": sum(ordered),
+                "mean": sum(ordered) / len(ordered),
+                "p50": pct[49],
+                "p95": pct[94],
+                "max": ordered[-1],
+            }
+        return stages
+
+tracer = Tracer(enabled=TRACE)
+
+def traced(name: str = None):
+    """Record every call of the decorated (sync or async) function as a span."""
+    def decorator(fn):
+        stage = name or fn.__qualname__
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not tracer.enabled:
+                    return await fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    tracer.durations[stage].append(time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                tracer.durations[stage].append(time.perf_counter() - start)
+        return wrapper
+    return decorator
@@ -1,13 +1,28 @@
-import ctypes
+import sys
 import threading
-import tkinter as tk
+
+# off Windows (e.g. Linux batch hosts) dialogs and overlays degrade to console output.
+# ctypes/tkinter are imported on first use so headless runs never load them.
+IS_WINDOWS = sys.platform == "win32"
 
 def show_msgbox(title: str, message: str):
-    """Blocking Windows MessageBox (for validation)."""
+    """Blocking Windows MessageBox (for validation); printed and non-blocking elsewhere."""
+    if not IS_WINDOWS:
+        print(f"[{title}] {message}")
+        return
+    import ctypes
     ctypes.windll.user32.MessageBoxW(0, message, title, 0)
 
+def prompt_user(title: str, message: str):
+    """Block until the user confirms: the message box on Windows, Enter on a terminal elsewhere."""
+    if IS_WINDOWS or not sys.stdin.isatty():
+        show_msgbox(title, message)
+        return
+    input(f"[{title}] {message.replace('click OK', 'press Enter')} ")
+
 def _overlay_thread(text: str, stop_event):
     """Tkinter overlay running in a thread; shows centered near top and updates until stop_event is set."""
+    import tkinter as tk
     root = tk.Tk()
     root.overrideredirect(True)  # no title bar
     root.attributes("-topmost", True)
@@ -35,6 +50,9 @@ def _overlay_thread(text: str, stop_event):
 def show_overlay(text: str):
     """Non-blocking overlay. Returns a stop_event function to dismiss the overlay."""
     stop_event = threading.Event()
+    if not IS_WINDOWS:
+        print(text)
+        return stop_event
     thr = threading.Thread(target=_overlay_thread, args=(text, stop_event), daemon=True)
     thr.start()
     return stop_event
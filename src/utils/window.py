@@ -9,7 +9,8 @@ This module is designed to be reusable across projects.
 """
 
 from typing import Optional
-import time
+import asyncio
+import sys
 
 async def cdp_maximize_and_get_bounds(page):
     """Use CDP to maximize and return bounds {left, top, width, height} or None."""
@@ -20,15 +21,20 @@ async def cdp_maximize_and_get_bounds(page):
         if window_id is None:
             return None
         await session.send("Browser.setWindowBounds", {"windowId": window_id, "bounds": {"windowState": "maximized"}})
-        # small pause then get bounds
-        time.sleep(0.5)
-        bounds = await session.send("Browser.getWindowBounds", {"windowId": window_id})
+        # poll (without blocking the event loop) until the window reports maximized, up to ~1s
+        for _ in range(10):
+            bounds = await session.send("Browser.getWindowBounds", {"windowId": window_id})
+            if bounds.get("bounds", {}).get("windowState") == "maximized":
+                break
+            await asyncio.sleep(0.1)
         return bounds.get("bounds")
     except Exception:
         return None
 
 def pywinauto_maximize_and_get_bounds(title_hint: Optional[str] = None):
     """Fallback using pywinauto to maximize window and return bounds dict or None."""
+    if sys.platform != "win32":
+        return None
     try:
         from pywinauto import Desktop
     except Exception:
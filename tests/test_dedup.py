@@ -0,0 +1,75 @@
+# tests/test_dedup.py
+"""Near-duplicate detection: within a run before the jobs are written, and against stored jobs."""
+
+import random
+
+import pytest
+
+from src import database
+from src.dedup import dedup_text, job_signature, signature, similarity
+
+_rng = random.Random(7)
+WORDS = [f"word{i}" for i in range(400)]
+DESCRIPTION = " ".join(_rng.choice(WORDS) for _ in range(300))
+
+def _job(listing_id, description=DESCRIPTION, title="Data Engineer", company="Acme"):
+    return {"listing_id": listing_id, "title": title, "company": company, "location": "London",
+            "description": description}
+
+def _edited(text, every):
+    """The text with every `every`-th word replaced, to lower its similarity step by step."""
+    words = text.split()
+    return " ".join(f"edit{i}" if i % every == 0 else word for i, word in enumerate(words))
+
+@pytest.fixture
+def writer(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", database.DB_PATH)
+    database.use_database(tmp_path / "dedup.db")
+    database.init_db()
+    job_title_id = database.get_or_create("job_titles", "title", "search")
+    yield database.JobWriter(None, job_title_id, batch_size=100, flush_interval=3600)
+    database.close_connection()
+
+def test_duplicate_within_run_before_flush(writer):
+    first = _job("1")
+    assert writer.check_duplicate(first) is None
+    writer.add(first)
+    # neither is stored yet: found in the writer's pending index
+    assert database.find_duplicate(_job("2")) is None
+    assert writer.check_duplicate(_job("2")) == "listing 1"
+
+    writer.flush()
+    assert database.get_connection().execute("SELECT COUNT(*) FROM jobs").fetchone()[0] == 1
+
+def test_duplicate_of_stored_job(writer):
+    writer.add(_job("1"))
+    writer.flush()
+    job_id = database.get_connection().execute("SELECT id FROM jobs WHERE listing_id = '1'").fetchone()[0]
+
+    assert writer.check_duplicate(_job("2", description=_edited(DESCRIPTION, 100))) == f"job {job_id}"
+    # a stored listing is not a duplicate of itself
+    assert database.find_duplicate(_job("1")) is None
+
+def test_pair_below_threshold_not_flagged(writer):
+    original = _job("1")
+    edited = _job("2", description=_edited(DESCRIPTION, 50))
+    score = similarity(job_signature(original), job_signature(edited))
+    assert 0.75 < score < 0.8
+
+    writer.add(original)
+    writer.flush()
+    assert writer.check_duplicate(edited, threshold=0.8) is None
+    # the same pair is flagged once the threshold is at its similarity
+    assert writer.check_duplicate(_job("3", description=edited["description"]), threshold=score) is not None
+
+def test_short_description_falls_back_to_title_and_company(writer):
+    assert dedup_text(_job("1", description="")) == "Data Engineer\nAcme\n"
+    assert signature(dedup_text(_job("1", description="", title="", company=""))) is None
+
+    writer.add(_job("1", description=""))
+    writer.flush()
+    assert writer.check_duplicate(_job("2", description="")) is not None
+    assert writer.check_duplicate(_job("3", description="", company="Globex")) is None
+    assert writer.check_duplicate(_job("4", description="", title="Data Analyst")) is None
+    # no words at all: no signature, never a duplicate
+    assert writer.check_duplicate(_job("5", description="", title="", company="")) is None
@@ -0,0 +1,70 @@
+# tests/test_jobs_fts.py
+"""jobs_fts must follow the jobs table: upserts from this module and writes from other clients."""
+
+import sqlite3
+
+import pytest
+
+from src import database
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", database.DB_PATH)
+    path = tmp_path / "fts.db"
+    database.use_database(path)
+    database.init_db()
+    yield path
+    database.close_connection()
+
+def _found(query):
+    return sorted(job["listing_id"] for job in database.search_jobs(query))
+
+def _job(listing_id, title, description, company="Acme"):
+    return {"listing_id": listing_id, "title": title, "company": company, "location": "London",
+            "description": description}
+
+def test_upsert_replaces_indexed_terms(db_path):
+    database.insert_jobs(None, None, [_job("1", "Python developer", "Django and Celery"),
+                                      _job("2", "Nurse", "Night shifts")])
+    assert _found("python") == ["1"]
+    assert _found("django") == ["1"]
+
+    # same listing scraped again with another title and description
+    database.insert_jobs(None, None, [_job("1", "Rust developer", "Tokio services")])
+    assert _found("python") == []
+    assert _found("django") == []
+    assert _found("rust") == ["1"]
+    assert _found("tokio") == ["1"]
+
+    database.insert_job(None, None, "Go developer", "Acme", "London", "Kubernetes", listing_id="1")
+    assert _found("rust OR tokio") == []
+    assert _found("kubernetes") == ["1"]
+    assert _found("nurse") == ["2"]
+
+def test_upserts_within_one_batch_keep_the_last(db_path):
+    database.insert_jobs(None, None, [_job("1", "Python developer", "Django"),
+                                      _job("1", "Rust developer", "Tokio")])
+    assert _found("python OR django") == []
+    assert _found("rust") == ["1"]
+
+def test_writes_from_other_connections_are_resynced(db_path):
+    database.insert_jobs(None, None, [_job("1", "Python developer", "Django"),
+                                      _job("2", "Nurse", "Night shifts")])
+    database.close_connection()
+
+    # a plain connection (sqlite3 CLI, DB browser) has none of this module's functions
+    other = sqlite3.connect(db_path)
+    with other:
+        other.execute("DELETE FROM jobs WHERE listing_id = '2'")
+        other.execute("""
+        INSERT INTO jobs (title, company, location, description, date_scraped, listing_id)
+        VALUES ('Data engineer', 'Globex', 'Leeds', 'Spark pipelines', '2026-01-01', '3')
+        """)
+    other.close()
+
+    database.init_db()
+    assert _found("nurse OR night") == []
+    assert _found("spark") == ["3"]
+    assert _found("python") == ["1"]
+    indexed = database.get_connection().execute("SELECT COUNT(*) FROM jobs_fts").fetchone()[0]
+    assert indexed == 2
@@ -0,0 +1,83 @@
+# tests/test_keyword_matches.py
+"""job_keyword_matches must come out the same whether a keyword existed before or after the jobs."""
+
+import pytest
+
+from src import database
+from src.keywords import KeywordMatcher, MATCH_PHRASE, MATCH_SUBSTRING, MATCH_WORD
+
+KEYWORDS = [
+    ("x ray", MATCH_PHRASE),
+    ("data engineer", MATCH_PHRASE),
+    ("java", MATCH_WORD),
+    ("c++", MATCH_WORD),
+    ("ray", MATCH_WORD),
+    ("sponsor", MATCH_SUBSTRING),
+    ("no visa", MATCH_SUBSTRING),
+]
+
+JOBS = [
+    # a phrase must not run from the end of the title into the description
+    {"listing_id": "1", "title": "Radiographer x", "description": "ray department, night shifts"},
+    {"listing_id": "2", "title": "Radiographer", "description": "Busy X-Ray unit, X\nray trained"},
+    {"listing_id": "3", "title": "Senior Data\nEngineer", "description": "Spark"},
+    {"listing_id": "4", "title": "Engineer", "description": "data  engineer team, JavaScript and C++"},
+    {"listing_id": "5", "title": "Java developer", "description": "Kotlin"},
+    {"listing_id": "6", "title": "Analyst", "description": "We cannot sponsorship; no visa"},
+    {"listing_id": "7", "title": "Rayburn Ltd", "description": "raytracing, x rays"},
+    {"listing_id": "8", "title": "Nurse", "description": ""},
+]
+
+@pytest.fixture
+def open_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", database.DB_PATH)
+
+    def open_db(name):
+        database.use_database(tmp_path / name)
+        database.init_db()
+        return database.get_or_create("job_titles", "title", "search")
+
+    yield open_db
+    database.close_connection()
+
+def _stored_matches():
+    rows = database.get_connection().execute("""
+    SELECT j.listing_id, k.keyword FROM job_keyword_matches m
+    JOIN jobs j ON j.id = m.job_id
+    JOIN title_keywords k ON k.id = m.keyword_id
+    """).fetchall()
+    return set(rows)
+
+def _full_scan():
+    expected = set()
+    for keyword, mode in KEYWORDS:
+        matcher = KeywordMatcher([(keyword, mode)])
+        for job in JOBS:
+            if matcher.search(job["title"]) or matcher.search(job["description"]):
+                expected.add((job["listing_id"], keyword))
+    return expected
+
+def test_backfill_matches_insert_time_and_full_scan(open_db):
+    # keywords first: matches computed by JobWriter as the jobs are written
+    job_title_id = open_db("insert_time.db")
+    for keyword, mode in KEYWORDS:
+        database.add_keyword_for_title(job_title_id, keyword, mode)
+    database.insert_jobs(None, job_title_id, JOBS)
+    at_insert = _stored_matches()
+
+    # jobs first: matches computed by add_keyword_for_title (FTS prefilter for word/phrase)
+    job_title_id = open_db("backfill.db")
+    database.insert_jobs(None, job_title_id, JOBS)
+    for keyword, mode in KEYWORDS:
+        database.add_keyword_for_title(job_title_id, keyword, mode)
+    backfilled = _stored_matches()
+
+    expected = _full_scan()
+    assert at_insert == expected
+    assert backfilled == expected
+
+def test_phrase_does_not_span_title_and_description(open_db):
+    job_title_id = open_db("phrase.db")
+    database.add_keyword_for_title(job_title_id, "x ray", MATCH_PHRASE)
+    database.insert_jobs(None, job_title_id, JOBS[:2])
+    assert _stored_matches() == {("2", "x ray")}